@@ -2,43 +2,100 @@
 
 from __future__ import annotations
 
+import asyncio
+import atexit
 import json
+import logging
 import os
 import socket
+from dataclasses import dataclass
+from functools import cached_property, lru_cache
 from pathlib import Path
 from typing import Any, Dict
 
-from pydantic import BaseModel
 from pydantic_settings import BaseSettings
 
+try:
+    import orjson
+except ImportError:  # Fall back to stdlib json if orjson isn't installed
+    orjson = None
 
-def get_local_ip() -> str:
-    """Auto-detect the server's local IP address."""
+logger = logging.getLogger(__name__)
+
+
+def _dumps(data: Any) -> bytes:
+    """Serialize data to pretty-printed JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    return json.dumps(data, indent=2).encode("utf-8")
+
+
+def _loads(raw: bytes) -> Any:
+    """Parse JSON bytes."""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+@lru_cache(maxsize=1)
+def _detect_local_ip() -> str:
+    """Detect the local IP once per process (raises if detection fails)."""
+    # Create a socket and connect to an external address
+    # This doesn't actually send data, just determines which interface would be used
+    s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
     try:
-        # Create a socket and connect to an external address
-        # This doesn't actually send data, just determines which interface would be used
-        s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
         s.connect(("8.8.8.8", 80))
-        ip = s.getsockname()[0]
+        return s.getsockname()[0]
+    finally:
         s.close()
-        return ip
+
+
+def get_local_ip() -> str:
+    """Auto-detect the server's local IP address.
+
+    The result is cached; failures aren't, so a network that comes up after
+    startup is still picked up. Call clear_local_ip_cache() after NIC changes.
+    """
+    try:
+        return _detect_local_ip()
     except Exception:
         return "localhost"
 
 
+def clear_local_ip_cache() -> None:
+    """Forget the cached local IP so the next call re-detects it."""
+    _detect_local_ip.cache_clear()
+
+
 # Config file location (can be overridden by CONFIG_DIR env var)
 CONFIG_DIR = Path(os.getenv("CONFIG_DIR", "/app/config"))
 SETTINGS_FILE = CONFIG_DIR / "settings.json"
 
+# Read/write config files through a 64 KiB buffer (one syscall per file)
+IO_BUFFER_SIZE = 64 * 1024
+
+# Set once CONFIG_DIR has been created, so writes skip the mkdir syscall
+_config_dir_ready = False
 
-class TeddyCloudConfig(BaseModel):
+
+def _ensure_config_dir() -> None:
+    """Create CONFIG_DIR on first use."""
+    global _config_dir_ready
+    if not _config_dir_ready:
+        CONFIG_DIR.mkdir(parents=True, exist_ok=True)
+        _config_dir_ready = True
+
+
+@dataclass(slots=True, frozen=True)
+class TeddyCloudConfig:
     url: str = "http://localhost:80"  # External URL (UI/proxy)
     internal_url: str = ""  # Internal URL (audio fetching) - empty = use url
     api_base: str = "/api"
     timeout: int = 30
 
 
-class SpotifyConfig(BaseModel):
+@dataclass(slots=True, frozen=True)
+class SpotifyConfig:
     client_id: str = ""
     client_secret: str = ""
     redirect_uri: str = "http://localhost:8000/callback"
@@ -74,7 +131,8 @@ class Settings(BaseSettings):
         env_file_encoding = "utf-8"
         case_sensitive = False
 
-    @property
+    # Cached per instance; update_settings() drops them on mutation
+    @cached_property
     def teddycloud(self) -> TeddyCloudConfig:
         return TeddyCloudConfig(
             url=self.teddycloud_url,
@@ -83,7 +141,7 @@ class Settings(BaseSettings):
             timeout=self.teddycloud_timeout,
         )
 
-    @property
+    @cached_property
     def spotify(self) -> SpotifyConfig:
         return SpotifyConfig(
             client_id=self.spotify_client_id,
@@ -92,31 +150,66 @@ class Settings(BaseSettings):
         )
 
 
+# Names of all Settings fields, for O(1) membership checks when merging
+_SETTINGS_FIELDS = frozenset(Settings.model_fields)
+
 _settings: Settings | None = None
 
+# Mirror of the settings.json contents, kept in sync by update_settings()
+_file_settings: dict[str, Any] | None = None
+
+# Memoized get_editable_settings() result (reset by update_settings)
+_editable_cache: dict[str, Any] | None = None
+
+
+def _read_json(path: Path) -> Any | None:
+    """Read and parse a JSON file, or return None if it doesn't exist."""
+    try:
+        with open(path, "rb", buffering=IO_BUFFER_SIZE) as f:
+            return _loads(f.read())
+    except FileNotFoundError:
+        return None
+
+
+def _write_file_atomic(path: Path, data: bytes) -> None:
+    """Write data to a temp file next to path, fsync once, then swap it in."""
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp_path, "wb", buffering=IO_BUFFER_SIZE) as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
 
 def load_settings_from_file() -> dict[str, Any]:
     """Load settings from JSON file if it exists."""
-    if SETTINGS_FILE.exists():
-        try:
-            with open(SETTINGS_FILE) as f:
-                return json.load(f)
-        except (json.JSONDecodeError, IOError):
-            pass
+    try:
+        data = _read_json(SETTINGS_FILE)
+        if data is not None:
+            return data
+    except (ValueError, IOError):
+        pass
     return {}
 
 
 def save_settings_to_file(settings: dict[str, Any]) -> bool:
     """Save settings to JSON file."""
     try:
-        CONFIG_DIR.mkdir(parents=True, exist_ok=True)
-        with open(SETTINGS_FILE, "w") as f:
-            json.dump(settings, f, indent=2)
+        _ensure_config_dir()
+        _write_file_atomic(SETTINGS_FILE, _dumps(settings))
         return True
     except IOError:
         return False
 
 
+def _get_file_settings() -> dict[str, Any]:
+    """Get the in-memory mirror of settings.json, loading it on first use."""
+    global _file_settings
+    if _file_settings is None:
+        _file_settings = load_settings_from_file()
+    return _file_settings
+
+
 def get_settings() -> Settings:
     """Get settings, merging env vars with JSON file (JSON takes precedence)."""
     global _settings
@@ -125,10 +218,10 @@ def get_settings() -> Settings:
         _settings = Settings()
 
         # Override with JSON file settings
-        file_settings = load_settings_from_file()
+        file_settings = _get_file_settings()
         if file_settings:
             for key, value in file_settings.items():
-                if hasattr(_settings, key):
+                if key in _SETTINGS_FIELDS:
                     setattr(_settings, key, value)
 
     return _settings
@@ -136,28 +229,36 @@ def get_settings() -> Settings:
 
 def update_settings(updates: dict[str, Any]) -> Settings:
     """Update settings and persist to JSON file."""
-    global _settings
+    global _settings, _editable_cache
     settings = get_settings()
 
-    # Load existing file settings
-    file_settings = load_settings_from_file()
+    # In-memory mirror of settings.json (no re-read/re-parse per update)
+    file_settings = _get_file_settings()
 
     # Apply updates
     for key, value in updates.items():
-        if hasattr(settings, key):
+        if key in _SETTINGS_FIELDS:
             setattr(settings, key, value)
             file_settings[key] = value
 
+    # Drop cached sub-configs so they're rebuilt from the new values
+    settings.__dict__.pop("teddycloud", None)
+    settings.__dict__.pop("spotify", None)
+
     # Save to file
     save_settings_to_file(file_settings)
+    _editable_cache = None
 
     return settings
 
 
 def get_editable_settings() -> dict[str, Any]:
     """Get settings that can be edited via the UI."""
+    global _editable_cache
+    if _editable_cache is not None:
+        return dict(_editable_cache)
     settings = get_settings()
-    return {
+    _editable_cache = {
         "teddycloud_url": settings.teddycloud_url,
         "server_url": settings.server_url,
         "default_playback_target": settings.default_playback_target,
@@ -167,6 +268,7 @@ def get_editable_settings() -> dict[str, Any]:
         "spotify_client_secret": settings.spotify_client_secret,
         "audio_cache_max_mb": settings.audio_cache_max_mb,
     }
+    return dict(_editable_cache)
 
 
 # =============================================
@@ -176,6 +278,11 @@ PREFERENCES_FILE = CONFIG_DIR / "preferences.json"
 
 _preferences: dict[str, Any] | None = None
 
+# Preference writes are coalesced: updates only mark the in-memory dict dirty
+# and preferences_flush_loop() persists it at most once per interval.
+PREFERENCES_FLUSH_INTERVAL = 1.0
+_preferences_dirty = False
+
 
 def get_preferences() -> dict[str, Any]:
     """Get user preferences from file."""
@@ -186,31 +293,66 @@ def get_preferences() -> dict[str, Any]:
             "hiddenItems": [],
             "starredDevices": ["browser|web"],
         }
-        if PREFERENCES_FILE.exists():
-            try:
-                with open(PREFERENCES_FILE) as f:
-                    loaded = json.load(f)
-                    _preferences.update(loaded)
-            except (json.JSONDecodeError, IOError):
-                pass
+        try:
+            loaded = _read_json(PREFERENCES_FILE)
+            if loaded:
+                _preferences.update(loaded)
+        except (ValueError, IOError):
+            pass
     return _preferences
 
 
 def update_preferences(updates: dict[str, Any]) -> dict[str, Any]:
-    """Update preferences and persist to file."""
-    global _preferences
+    """Update preferences in memory and schedule them for persistence."""
+    global _preferences_dirty
     prefs = get_preferences()
 
     # Apply updates
     for key, value in updates.items():
         prefs[key] = value
 
-    # Save to file
-    try:
-        CONFIG_DIR.mkdir(parents=True, exist_ok=True)
-        with open(PREFERENCES_FILE, "w") as f:
-            json.dump(prefs, f, indent=2)
-    except IOError:
-        pass
+    # Written to file by the next flush_preferences()
+    _preferences_dirty = True
 
     return prefs
+
+
+def _write_preferences(data: bytes) -> None:
+    _ensure_config_dir()
+    _write_file_atomic(PREFERENCES_FILE, data)
+
+
+def flush_preferences() -> bool:
+    """Persist preferences to file if they changed since the last flush."""
+    global _preferences_dirty
+    if not _preferences_dirty or _preferences is None:
+        return True
+    try:
+        _write_preferences(_dumps(_preferences))
+        _preferences_dirty = False
+        return True
+    except Exception as e:
+        logger.warning(f"Failed to save preferences: {e}")
+        return False
+
+
+async def preferences_flush_loop(interval: float = PREFERENCES_FLUSH_INTERVAL):
+    """Background task that periodically flushes dirty preferences to disk."""
+    global _preferences_dirty
+    while True:
+        await asyncio.sleep(interval)
+        if not _preferences_dirty or _preferences is None:
+            continue
+        # Serialize on the loop (no concurrent edits), fsync off it
+        try:
+            data = _dumps(_preferences)
+            _preferences_dirty = False
+            await asyncio.to_thread(_write_preferences, data)
+        except Exception as e:
+            # Retried on the next tick
+            _preferences_dirty = True
+            logger.warning(f"Failed to save preferences: {e}")
+
+
+# Final flush in case the process exits without a clean lifespan shutdown
+atexit.register(flush_preferences)
@@ -1,18 +1,33 @@
 import asyncio
+import hashlib
+import json
 import logging
 from collections import deque
 from contextlib import asynccontextmanager
+from dataclasses import dataclass
 from datetime import datetime
+from functools import lru_cache, partial
+from itertools import islice
+from operator import itemgetter
 import time
 from pathlib import Path
+from typing import Awaitable, Callable, Coroutine
 
+import aiohttp
 import os
+import posixpath
 from fastapi import FastAPI, HTTPException, Request
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse, StreamingResponse
+from fastapi.responses import (
+    FileResponse,
+    JSONResponse,
+    ORJSONResponse,
+    Response,
+    StreamingResponse,
+)
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
-from urllib.parse import quote  # Added this import
+from urllib.parse import quote
 
 from .services.transcoding import (
     transcode_stream,
@@ -22,6 +37,7 @@ from .services.transcoding import (
     get_cache_stats,
     clear_cache,
     get_encoding_status,
+    wait_for_encoding,
     # Multi-track support (all encoding uses this now)
     get_or_encode_tracks,
     get_cached_tracks,
@@ -29,6 +45,8 @@ from .services.transcoding import (
     get_track_cache_path,
     set_encoding_status,
     get_tonie_cache_key,
+    is_fully_encoded,
+    forget_fully_encoded,
     # Progressive encoding - first track then background
     encode_first_track,
     continue_encoding_remaining_tracks,
@@ -41,12 +59,19 @@ from .config import (
     get_local_ip,
     get_preferences,
     update_preferences,
+    flush_preferences,
+    preferences_flush_loop,
 )
 from .services.teddycloud import TeddyCloudClient
 from .services import devices as device_service
 import re
 import unicodedata
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover - stdlib fallback
+    orjson = None
+
 # Feature flags from environment variables
 ESPUINO_ENABLED = os.environ.get("ESPUINO_ENABLED", "false").lower() in (
     "true",
@@ -54,18 +79,64 @@ ESPUINO_ENABLED = os.environ.get("ESPUINO_ENABLED", "false").lower() in (
     "yes",
 )
 
+# Number of track uploads kept in flight to one ESPuino
+ESPUINO_UPLOAD_WINDOW = max(1, int(os.getenv("ESPUINO_UPLOAD_WINDOW", "3")))
+
+# Background-only encodes (remaining tracks, prefetch) allowed to run at once
+BACKGROUND_ENCODE_LIMIT = max(1, int(os.getenv("BACKGROUND_ENCODE_LIMIT", "2")))
+
+# Unsafe characters and ASCII whitespace (control chars included) -> underscore
+_SANITIZE_TABLE = {c: "_" for c in range(0x20)}
+_SANITIZE_TABLE.update({ord(ch): "_" for ch in '<>:"/\\|?* '})
+_HEX_ONLY = re.compile(r"[^0-9A-F]")
+
+
+_json_loads = orjson.loads if orjson is not None else json.loads
+
+
+def _json_compact(data) -> bytes:
+    """Serialize data as compact JSON bytes (orjson when available)."""
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, separators=(",", ":")).encode("utf-8")
+
+
+class NonStrKeysORJSONResponse(ORJSONResponse):
+    """ORJSONResponse that, like JSONResponse, accepts non-str dict keys."""
+
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
+def _etag_response(request: Request, payload) -> Response:
+    """JSON response with an ETag; 304 if the client already has this payload."""
+    body = _json_compact(payload)
+    etag = f'"{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def _json_bytes(data) -> bytes:
+    """Serialize data as indented JSON bytes (orjson when available)."""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    return json.dumps(data, indent=2).encode("utf-8")
+
 
+@lru_cache(maxsize=2048)
 def sanitize_filename(name: str, max_length: int = 50) -> str:
     """Make a string safe for use as a filename on any filesystem."""
     if not name:
         return "unknown"
     # Normalize unicode and remove accents
     name = unicodedata.normalize("NFKD", name).encode("ascii", "ignore").decode("ascii")
-    # Replace unsafe characters with underscore
-    name = re.sub(r'[<>:"/\\|?*\x00-\x1f]', "_", name)
-    # Replace spaces and multiple underscores
-    name = re.sub(r"\s+", "_", name)
-    name = re.sub(r"_+", "_", name)
+    # Replace unsafe characters and whitespace with underscore in one pass
+    name = name.translate(_SANITIZE_TABLE)
+    # Collapse runs of underscores
+    while "__" in name:
+        name = name.replace("__", "_")
     # Remove leading/trailing underscores and dots
     name = name.strip("_.")
     # Truncate to max length
@@ -74,13 +145,21 @@ def sanitize_filename(name: str, max_length: int = 50) -> str:
     return name or "unknown"
 
 
+_VIRTUAL_READERS = frozenset({"manual-stream", "browser-session"})
+
+# Networked players that fetch audio over HTTP and need it pre-encoded
+NETWORK_PLAYER_TYPES = frozenset({"sonos", "airplay", "chromecast"})
+# Device types fed from the MP3 transcode cache
+TRANSCODE_TYPES = NETWORK_PLAYER_TYPES | {"espuino"}
+
+
+@lru_cache(maxsize=1024)
 def _is_virtual_reader(reader_ip: str) -> bool:
     """Check if reader_ip is a virtual/web-based reader (not a physical ESPuino)."""
-    return reader_ip in ("manual-stream", "browser-session") or reader_ip.startswith(
-        "web-"
-    )
+    return reader_ip in _VIRTUAL_READERS or reader_ip.startswith("web-")
 
 
+@lru_cache(maxsize=4096)
 def build_espuino_dest_path(
     uid: str, series: str, episode: str, track_index: int = None, track_name: str = None
 ) -> tuple[str, str]:
@@ -107,6 +186,7 @@ def build_espuino_dest_path(
         return folder_path, f"{folder_path}/full.mp3"
 
 
+@lru_cache(maxsize=512)
 def _uid_suffix_from_uid(uid: str) -> str:
     """Return ESPuino UID suffix (last 4 bytes) like 0E-F4-BA-91."""
     if not uid:
@@ -117,13 +197,14 @@ def _uid_suffix_from_uid(uid: str) -> str:
         if len(parts) >= 4:
             return "-".join(parts[-4:])
     # Fallback: strip non-hex and take last 8 chars
-    hex_only = re.sub(r"[^0-9A-F]", "", raw)
+    hex_only = _HEX_ONLY.sub("", raw)
     if len(hex_only) >= 8:
         tail = hex_only[-8:]
         return "-".join([tail[i : i + 2] for i in range(0, 8, 2)])
     return ""
 
 
+@lru_cache(maxsize=512)
 def build_espuino_uid_map_path(uid: str) -> str:
     """Build UID mapping path for ESPuino SD card (suffix-based)."""
     suffix = _uid_suffix_from_uid(uid)
@@ -131,6 +212,7 @@ def build_espuino_uid_map_path(uid: str) -> str:
     return f"/teddycloud/uids/{safe_uid}.json"
 
 
+@lru_cache(maxsize=512)
 def uid_to_espuino_tag_id(uid: str) -> str:
     """Convert UID (e.g., 0E:F4:D7:AC) to ESPuino decimal triplet tag ID."""
     if not uid:
@@ -144,7 +226,7 @@ def uid_to_espuino_tag_id(uid: str) -> str:
         else:
             return ""
     else:
-        hex_only = re.sub(r"[^0-9A-F]", "", raw)
+        hex_only = _HEX_ONLY.sub("", raw)
         if len(hex_only) < 8:
             return ""
         parts = [
@@ -175,29 +257,27 @@ async def check_espuino_active_tag(ip: str, expected_uid: str) -> bool | None:
         return None
 
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(
-                f"http://{ip}/settings", timeout=aiohttp.ClientTimeout(total=5)
-            ) as resp:
-                if resp.status != 200:
-                    logger.debug(f"ESPuino {ip} /settings returned {resp.status}")
-                    return None
-
-                data = await resp.json()
-                current = data.get("current", {})
-                active_tag_id = current.get("rfidTagId", "")
-
-                if not active_tag_id:
-                    # No tag currently active
-                    return False
-
-                # Compare tag IDs
-                matches = active_tag_id == expected_tag_id
-                if not matches:
-                    logger.debug(
-                        f"ESPuino {ip} tag mismatch: active={active_tag_id}, expected={expected_tag_id}"
-                    )
-                return matches
+        session = device_service.get_espuino_session()
+        async with session.get(f"http://{ip}/settings") as resp:
+            if resp.status != 200:
+                logger.debug(f"ESPuino {ip} /settings returned {resp.status}")
+                return None
+
+            data = await resp.json(loads=_json_loads)
+            current = data.get("current", {})
+            active_tag_id = current.get("rfidTagId", "")
+
+            if not active_tag_id:
+                # No tag currently active
+                return False
+
+            # Compare tag IDs
+            matches = active_tag_id == expected_tag_id
+            if not matches:
+                logger.debug(
+                    f"ESPuino {ip} tag mismatch: active={active_tag_id}, expected={expected_tag_id}"
+                )
+            return matches
 
     except asyncio.TimeoutError:
         logger.debug(f"ESPuino {ip} /settings timeout")
@@ -213,11 +293,107 @@ async def check_espuino_active_tag(ip: str, expected_uid: str) -> bool | None:
 # Background task handle for smart ping
 _smart_ping_task: asyncio.Task | None = None
 
+# Background task handle for coalesced preference writes
+_prefs_flush_task: asyncio.Task | None = None
+
+# Background task handle for coalesced reader cache writes
+_reader_cache_flush_task: asyncio.Task | None = None
+
+# Fire-and-forget tasks, referenced until done so they can't be GC'd mid-run
+_background_tasks: set[asyncio.Task] = set()
+_background_encode_slots = asyncio.Semaphore(BACKGROUND_ENCODE_LIMIT)
+# audio_url -> the background encode queued or running for it
+_background_encodes: dict[str, asyncio.Task] = {}
+
+
+def _spawn(coro: Coroutine) -> asyncio.Task:
+    """Run coro in the background; it's cancelled on shutdown."""
+    task = asyncio.create_task(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    return task
+
+
+async def _with_encode_slot(coro: Coroutine) -> None:
+    try:
+        async with _background_encode_slots:
+            await coro
+    finally:
+        coro.close()  # No-op once run; avoids "never awaited" if cancelled early
+
+
+def _spawn_encode(
+    coro: Coroutine, audio_url: str, coalesce: bool = True
+) -> asyncio.Task:
+    """Like _spawn, but at most BACKGROUND_ENCODE_LIMIT of these run at once.
+
+    Slots are handed out first come, first served. If audio_url is already
+    being encoded, a coalescing request is dropped in favour of that task;
+    otherwise (it still has a device to feed) it queues for its own slot
+    behind the running one. First-track encodes stay ungated so a new tap
+    never queues behind them.
+    """
+    running = _background_encodes.get(audio_url)
+    if running is not None:
+        if coalesce:
+            logger.info(f"Background encode already queued: {audio_url[:60]}...")
+            coro.close()
+            return running
+        return _spawn(_with_encode_slot(coro))
+
+    task = _spawn(_with_encode_slot(coro))
+    _background_encodes[audio_url] = task
+
+    def forget(t: asyncio.Task) -> None:
+        if _background_encodes.get(audio_url) is t:
+            del _background_encodes[audio_url]
+
+    task.add_done_callback(forget)
+    return task
+
+
+# Probed once at startup (and on /debug/refresh-ffmpeg), not per /debug call
+ffmpeg_available = False
+
+
+async def _smart_ping_reader(ip: str, state: "ReaderState") -> None:
+    """Ping a single ESPuino reader and refresh last_seen if it still plays our tag."""
+    current = state.current_tag
+    if not current:
+        return
+
+    # Skip virtual/web readers
+    if _is_virtual_reader(ip):
+        return
+
+    # Only check ESPuino devices
+    device = state.current_device or device_service.get_device_for_reader(ip)
+    if device.get("type") != "espuino":
+        return
+
+    # Check if ESPuino is still playing our tag
+    uid = current.get("uid", "")
+    if not uid:
+        return
+
+    result = await check_espuino_active_tag(ip, uid)
+
+    if result is True:
+        # Tag matches - update last_seen to keep stream alive
+        if ip in connected_readers:
+            connected_readers[ip]["last_seen"] = time.time()
+            logger.debug(f"Smart ping: ESPuino {ip} still playing {uid[:16]}...")
+    elif result is False:
+        # Different tag or no tag - let stale check handle cleanup
+        logger.info(f"Smart ping: ESPuino {ip} no longer playing {uid[:16]}...")
+    # result is None (unreachable) - don't update, let stale check decide
+
 
 async def smart_ping_espuino_readers():
     """Background task to check if ESPuino readers are still playing tracked content.
 
-    Runs every 60 seconds. For each ESPuino with an active stream:
+    Runs every 60 seconds. All ESPuinos with an active stream are pinged
+    concurrently, so one slow device doesn't delay the others:
     - Ping /settings to get current rfidTagId
     - If tag matches our tracked UID → update last_seen (keep stream alive)
     - If mismatch or offline → leave for stale check to clean up
@@ -226,42 +402,14 @@ async def smart_ping_espuino_readers():
         try:
             await asyncio.sleep(60)  # Run every 60 seconds
 
-            for ip, state in list(reader_states.items()):
-                current = state.get("current_tag")
-                if not current:
-                    continue
-
-                # Skip virtual/web readers
-                if _is_virtual_reader(ip):
-                    continue
-
-                # Only check ESPuino devices
-                device = state.get(
-                    "current_device"
-                ) or device_service.get_device_for_reader(ip)
-                if device.get("type") != "espuino":
-                    continue
-
-                # Check if ESPuino is still playing our tag
-                uid = current.get("uid", "")
-                if not uid:
-                    continue
-
-                result = await check_espuino_active_tag(ip, uid)
-
-                if result is True:
-                    # Tag matches - update last_seen to keep stream alive
-                    if ip in connected_readers:
-                        connected_readers[ip]["last_seen"] = datetime.now().isoformat()
-                        logger.debug(
-                            f"Smart ping: ESPuino {ip} still playing {uid[:16]}..."
-                        )
-                elif result is False:
-                    # Different tag or no tag - let stale check handle cleanup
-                    logger.info(
-                        f"Smart ping: ESPuino {ip} no longer playing {uid[:16]}..."
-                    )
-                # result is None (unreachable) - don't update, let stale check decide
+            readers = iter_streaming_readers()
+            results = await asyncio.gather(
+                *[_smart_ping_reader(ip, state) for ip, state in readers],
+                return_exceptions=True,
+            )
+            for (ip, _), result in zip(readers, results):
+                if isinstance(result, Exception):
+                    logger.error(f"Smart ping error for {ip}: {result}")
 
         except asyncio.CancelledError:
             logger.info("Smart ping task cancelled")
@@ -271,8 +419,41 @@ async def smart_ping_espuino_readers():
             # Continue running despite errors
 
 
+def _cached_track_sizes(audio_url: str, count: int) -> list[int]:
+    """Sizes of the first `count` cached track MP3s (0 if missing).
+
+    Uses one directory scan instead of exists()+stat() per track.
+    """
+    by_name = {}
+    try:
+        with os.scandir(get_tonie_cache_dir(audio_url)) as entries:
+            for entry in entries:
+                if entry.is_file():
+                    by_name[entry.name] = entry.stat().st_size
+    except FileNotFoundError:
+        pass
+    return [
+        by_name.get(get_track_cache_path(audio_url, i).name, 0) for i in range(count)
+    ]
+
+
+async def _stat_track_sizes(audio_url: str, count: int) -> list[int]:
+    """Collect cached track sizes in a worker thread (keeps the loop free)."""
+    return await asyncio.to_thread(_cached_track_sizes, audio_url, count)
+
+
+def _track_name(track: dict, index: int) -> str:
+    """Display/file name for a track, falling back to its 1-based number."""
+    return track.get("name") or f"Track {index + 1}"
+
+
 def build_upload_metadata(
-    uid: str, series: str, episode: str, tracks: list[dict], audio_url: str
+    uid: str,
+    series: str,
+    episode: str,
+    tracks: list[dict],
+    audio_url: str,
+    sizes: list[int] | None = None,
 ) -> dict:
     """
     Build metadata for ESPuino upload folder.
@@ -280,21 +461,23 @@ def build_upload_metadata(
     This metadata.json file allows the system to:
     - Match folders to Tonie UIDs
     - Verify all tracks are present
-    - Check file integrity via sizes/hashes
+    - Check file integrity via sizes
+
+    Pass `sizes` (from _stat_track_sizes) to skip re-reading the cache dir.
     """
-    import hashlib
+    if sizes is None:
+        sizes = _cached_track_sizes(audio_url, len(tracks))
 
     track_files = []
     for i, track in enumerate(tracks):
-        track_name = track.get("name", f"Track {i + 1}")
+        track_name = _track_name(track, i)
         _, file_path = build_espuino_dest_path(uid, series, episode, i, track_name)
-        cache_path = get_track_cache_path(audio_url, i)
-        size = cache_path.stat().st_size if cache_path.exists() else 0
+        size = sizes[i]
         track_files.append(
             {
                 "index": i,
                 "name": track_name,
-                "file": file_path.split("/")[-1],  # Just the filename
+                "file": posixpath.basename(file_path),
                 "duration": track.get("duration", 0),
                 "size": size,
             }
@@ -310,25 +493,176 @@ def build_upload_metadata(
         "audio_url": audio_url,
         "tracks": track_files,
         "total_tracks": len(tracks),
-        "uploaded_at": datetime.now().isoformat(),
+        "uploaded_at": _now_iso_cached(),
     }
 
 
+def _build_uid_map_files(dest_paths: list[str], sizes: list[int]) -> list[dict]:
+    """Build the uid_map "files" list from precomputed SD paths and sizes."""
+    return [
+        {"index": i, "name": posixpath.basename(dest_path), "size": sizes[i]}
+        for i, dest_path in enumerate(dest_paths)
+    ]
+
+
+# (espuino_ip, uid_map_path) -> time the uid_map was last known to be on the SD card
+_uid_map_seen: dict[tuple[str, str], float] = {}
+UID_MAP_SEEN_TTL = 3600
+
+
+def _uid_map_recently_seen(espuino_ip: str, uid_map_path: str) -> bool:
+    """Whether the uid_map was uploaded or found on the SD card within the TTL."""
+    seen_at = _uid_map_seen.get((espuino_ip, uid_map_path))
+    return seen_at is not None and time.time() - seen_at < UID_MAP_SEEN_TTL
+
+
+async def _upload_uid_map(
+    espuino_ip: str,
+    uid_map: dict,
+    uid_map_path: str,
+    title: str,
+    total_tracks: int = 1,
+    max_kbps: int | None = None,
+    skip_unchanged: bool = False,
+    session: aiohttp.ClientSession | None = None,
+) -> dict:
+    """Upload a uid_map straight from memory.
+
+    With skip_unchanged, the map on the card is read back first and the
+    upload is skipped if it already holds exactly these bytes.
+    """
+    data = _json_bytes(uid_map)
+
+    if skip_unchanged:
+        remote_map = await device_service.read_espuino_text_file(
+            espuino_ip, uid_map_path, session=session
+        )
+        if remote_map is not None and remote_map.encode() == data:
+            logger.info(
+                f"UID map unchanged on ESPuino, skipping upload: {uid_map_path}"
+            )
+            _uid_map_seen[(espuino_ip, uid_map_path)] = time.time()
+            return {"success": True, "path": uid_map_path, "unchanged": True}
+
+    result = await device_service.upload_to_espuino(
+        espuino_ip,
+        data,
+        uid_map_path,
+        title=f"{title} - uid-map",
+        total_tracks=total_tracks,
+        max_kbps=max_kbps,
+        is_aux=True,
+        session=session,
+    )
+    if result.get("success"):
+        _uid_map_seen[(espuino_ip, uid_map_path)] = time.time()
+    return result
+
+
+# (epoch second, ISO string) of the last timestamp handed out
+_now_iso_cache: tuple[int, str] = (0, "")
+
+
+def _now_iso_cached() -> str:
+    """Return the current local time as an ISO string at one-second resolution.
+
+    Reader/scan bookkeeping stamps many records per second; the string is only
+    rebuilt when the second changes.
+    """
+    global _now_iso_cache
+    now = int(time.time())
+    if now != _now_iso_cache[0]:
+        _now_iso_cache = (now, datetime.fromtimestamp(now).isoformat())
+    return _now_iso_cache[1]
+
+
+@lru_cache(maxsize=1024)
+def _iso_from_epoch(ts: int) -> str:
+    return datetime.fromtimestamp(ts).isoformat()
+
+
+def _readable_times(data: dict) -> dict:
+    """Copy a reader record with its epoch timestamps as ISO strings.
+
+    Hot paths store time.time() floats; they're only formatted for output.
+    """
+    out = data.copy()
+    for key in ("first_seen", "last_seen"):
+        ts = out.get(key)
+        if isinstance(ts, float):
+            out[key] = _iso_from_epoch(int(ts))
+    return out
+
+
 # Custom log handler to capture recent logs
+class _LogEntry:
+    """One captured record; JSON-encoded on first read, then cached."""
+
+    __slots__ = ("created", "level", "logger", "message", "_raw")
+
+    def __init__(self, created: float, level: str, logger: str, message: str):
+        self.created = created
+        self.level = level
+        self.logger = logger
+        self.message = message
+        self._raw: bytes | None = None
+
+    def raw(self) -> bytes:
+        if self._raw is None:
+            self._raw = _json_compact(
+                {
+                    "time": datetime.fromtimestamp(self.created).isoformat(),
+                    "level": self.level,
+                    "logger": self.logger,
+                    "message": self.message,
+                }
+            )
+        return self._raw
+
+
 class LogCapture(logging.Handler):
+    """Ring buffer of recent log records.
+
+    emit() only formats the message (so later changes to the log args
+    can't leak in); the timestamp and JSON encoding are done on the first
+    read and cached, so most records are never serialized at all.
+    """
+
     def __init__(self, maxlen=100):
         super().__init__()
         self.logs = deque(maxlen=maxlen)
+        # Same entries again, one ring per level, so level filters skip the rest
+        self.by_level: dict[str, deque] = {}
 
     def emit(self, record):
-        self.logs.append(
-            {
-                "time": datetime.fromtimestamp(record.created).isoformat(),
-                "level": record.levelname,
-                "logger": record.name,
-                "message": self.format(record),
-            }
+        entry = _LogEntry(
+            record.created, record.levelname, record.name, self.format(record)
         )
+        self.logs.append(entry)
+        level_logs = self.by_level.get(record.levelname)
+        if level_logs is None:
+            level_logs = self.by_level[record.levelname] = deque(
+                maxlen=self.logs.maxlen
+            )
+        level_logs.append(entry)
+
+    def _ring(self, level: str | None) -> deque:
+        return self.logs if level is None else self.by_level.get(level, deque())
+
+    def count(self, level: str | None = None) -> int:
+        return len(self._ring(level))
+
+    def latest(self, limit: int | None = None, level: str | None = None) -> list[bytes]:
+        """Newest JSON-encoded records first, optionally for one level only."""
+        # list() copies at most maxlen refs; worker threads may log meanwhile
+        entries = list(self._ring(level))
+        if limit is not None:
+            entries = entries[-limit:]
+        return [entry.raw() for entry in reversed(entries)]
+
+    def snapshot(self, limit: int | None = None) -> list[dict]:
+        """The last `limit` captured records as dicts, oldest first."""
+        return [_json_loads(raw) for raw in reversed(self.latest(limit))]
 
 
 log_capture = LogCapture(maxlen=100)
@@ -344,31 +678,72 @@ logging.getLogger().addHandler(log_capture)
 teddycloud_client: TeddyCloudClient | None = None
 
 # Track connected readers and recent scans
-connected_readers: dict[str, dict] = {}  # ip -> {last_seen, name, scan_count}
-recent_scans: deque = deque(maxlen=50)  # Store last 50 scans
+# ip -> {first_seen, last_seen, name, scan_count}; times are time.time() floats
+connected_readers: dict[str, dict] = {}
+
+
+@dataclass(slots=True)
+class ScanRecord:
+    """A single tag scan, as listed by /scans and /debug."""
+
+    time: float
+    uid: str
+    reader_ip: str
+    found: bool
+    title: str
+
+    def to_dict(self) -> dict:
+        return {
+            "time": _iso_from_epoch(int(self.time)),
+            "uid": self.uid,
+            "reader_ip": self.reader_ip,
+            "found": self.found,
+            "title": self.title,
+        }
+
+
+recent_scans: deque[ScanRecord] = deque(maxlen=50)  # Last 50 scans, oldest first
+
+
+def _latest_scans(limit: int) -> list[dict]:
+    """Newest-first scans without copying the whole ring buffer."""
+    return [scan.to_dict() for scan in islice(reversed(recent_scans), limit)]
+
 
 # Per-reader playback state
-reader_states: dict[str, dict] = {}  # ip -> state dict
+@dataclass(slots=True)
+class ReaderState:
+    """Playback state tracked for a single reader."""
+
+    current_tag: dict | None = None
+    current_started_at: float | None = None
+    current_offset: float = 0.0
+    resume: dict | None = None  # {"uid": str, "position": float, ...}
+    last_reported_position: float = 0.0
+    current_device: dict | None = None
+    # Stream-mode info set by /reader/mode for remote control
+    mode: str | None = None
+    target_device: dict | None = None
+    espuino_ip: str | None = None
+    reader_ip: str = ""
 
 
-def get_reader_state(reader_ip: str) -> dict:
+reader_states: dict[str, ReaderState] = {}  # ip -> state
+
+# audio_url -> {ip: state} for readers with a current tag (see set_current_tag)
+streams_by_audio_url: dict[str, dict[str, ReaderState]] = {}
+
+
+def get_reader_state(reader_ip: str) -> ReaderState:
     """Get or initialize the playback state for a reader."""
-    if reader_ip not in reader_states:
-        reader_states[reader_ip] = {
-            "current_tag": None,
-            "current_started_at": None,
-            "current_offset": 0.0,
-            "resume": None,  # {"uid": str, "position": float}
-            "last_reported_position": 0.0,
-            "current_device": None,
-        }
-    return reader_states[reader_ip]
+    state = reader_states.get(reader_ip)
+    if state is None:
+        state = reader_states[reader_ip] = ReaderState(reader_ip=reader_ip)
+    return state
 
 
 def build_audio_url(tonie: dict | None, uid: str, settings) -> str:
     """Build the source audio URL from TeddyCloud data."""
-    from urllib.parse import quote
-
     tc_base = settings.teddycloud.url.rstrip("/")
     if tc_base.endswith("/web"):
         tc_base = tc_base[:-4]
@@ -385,17 +760,21 @@ def build_audio_url(tonie: dict | None, uid: str, settings) -> str:
     return teddycloud_client.get_audio_url(uid) if teddycloud_client else ""
 
 
+@lru_cache(maxsize=1024)
+def _playback_url_cached(audio_url: str, server_base: str) -> str:
+    """Build the transcode URL; an empty server_base gives a relative URL."""
+    return f"{server_base}/transcode.mp3?url={quote(audio_url)}"
+
+
 def build_playback_url(audio_url: str, device_type: str, settings) -> str:
     """Build the URL used for playback.
 
     All devices use MP3 (CBR 192kbps, ~30s encoding) for best compatibility
     and stable streaming.
     """
-    from urllib.parse import quote
-
     # Browser playback needs relative URL to avoid mixed content errors (HTTP IP on HTTPS site)
     if device_type == "browser":
-        return f"/transcode.mp3?url={quote(audio_url)}"
+        return _playback_url_cached(audio_url, "")
 
     if settings.server_url:
         server_base = settings.server_url.rstrip("/")
@@ -404,7 +783,7 @@ def build_playback_url(audio_url: str, device_type: str, settings) -> str:
         server_base = f"http://{server_ip}:8754"
 
     # All devices use MP3 for best compatibility and seeking support
-    return f"{server_base}/transcode.mp3?url={quote(audio_url)}"
+    return _playback_url_cached(audio_url, server_base)
 
 
 def build_cover_url(picture: str, settings) -> str:
@@ -458,23 +837,15 @@ def build_track_urls(audio_url: str, settings, absolute: bool = True) -> list[st
 
     if not absolute:
         # Relative URLs for browser/frontend
-        cache_key = get_tonie_cache_key(audio_url)
-        return [
-            f"/tracks/{cache_key}/{track.index + 1:02d}.mp3"
-            for track in metadata.tracks
-        ]
-
-    if settings.server_url:
+        server_base = ""
+    elif settings.server_url:
         server_base = settings.server_url.rstrip("/")
     else:
         server_ip = get_local_ip()
         server_base = f"http://{server_ip}:8754"
 
-    cache_key = get_tonie_cache_key(audio_url)
-    return [
-        f"{server_base}/tracks/{cache_key}/{track.index + 1:02d}.mp3"
-        for track in metadata.tracks
-    ]
+    prefix = f"{server_base}/tracks/{get_tonie_cache_key(audio_url)}/"
+    return [f"{prefix}{track.index + 1:02d}.mp3" for track in metadata.tracks]
 
 
 async def get_resume_position(reader_ip: str, device: dict[str, str]) -> float:
@@ -488,7 +859,7 @@ async def get_resume_position(reader_ip: str, device: dict[str, str]) -> float:
     # Browser playback: only use position reported by the JS audio element
     # Never use wall-clock time calculation for browser (causes false progress)
     if device.get("type") == "browser":
-        return max(0.0, float(state.get("last_reported_position", 0)))
+        return max(0.0, float(state.last_reported_position))
 
     # For non-browser devices, try to get position from the device
     position = await device_service.get_device_position(device)
@@ -496,20 +867,47 @@ async def get_resume_position(reader_ip: str, device: dict[str, str]) -> float:
         return position
 
     # Fall back to time-based calculation for devices that don't report position
-    if state.get("current_started_at") is not None:
-        elapsed = time.time() - state["current_started_at"]
-        return max(0.0, state.get("current_offset", 0.0) + elapsed)
+    if state.current_started_at is not None:
+        elapsed = time.time() - state.current_started_at
+        return max(0.0, state.current_offset + elapsed)
 
     return 0.0
 
 
+def set_current_tag(state: ReaderState, tag: dict | None) -> None:
+    """Set a reader's current tag, keeping streams_by_audio_url in sync."""
+    if state.current_tag:
+        old_url = state.current_tag.get("audio_url", "")
+        readers = streams_by_audio_url.get(old_url)
+        if readers is not None:
+            readers.pop(state.reader_ip, None)
+            if not readers:
+                del streams_by_audio_url[old_url]
+    if tag:
+        url = tag.get("audio_url", "")
+        streams_by_audio_url.setdefault(url, {})[state.reader_ip] = state
+    state.current_tag = tag
+
+
+def iter_streaming_readers() -> list[tuple[str, ReaderState]]:
+    """(ip, state) for every reader with a current tag, grouped by audio_url."""
+    return [
+        (ip, state)
+        for readers in streams_by_audio_url.values()
+        for ip, state in readers.items()
+    ]
+
+
 def get_active_stream_count() -> int:
     """Count currently active reader streams."""
-    return sum(1 for state in reader_states.values() if state.get("current_tag"))
+    return sum(map(len, streams_by_audio_url.values()))
 
 
 async def stop_reader_playback(
-    reader_ip: str, save_resume: bool = True, pause_only: bool = False
+    reader_ip: str,
+    save_resume: bool = True,
+    pause_only: bool = False,
+    reader_device: dict[str, str] | None = None,
 ) -> None:
     """Stop playback for a reader and optionally store resume position.
 
@@ -518,18 +916,22 @@ async def stop_reader_playback(
         save_resume: Whether to save position for resume
         pause_only: If True, pause device and mark as resumable (tag removal).
                    If False, fully stop device (X button).
+        reader_device: Already-resolved device for the reader, used instead of
+                   a fresh lookup when no device is tracked in state.
     """
     state = get_reader_state(reader_ip)
-    current = state.get("current_tag")
+    current = state.current_tag
     if not current:
         return
 
-    device = state.get("current_device") or device_service.get_device_for_reader(
-        reader_ip
+    device = (
+        state.current_device
+        or reader_device
+        or device_service.get_device_for_reader(reader_ip)
     )
     if save_resume:
         position = await get_resume_position(reader_ip, device)
-        state["resume"] = {
+        state.resume = {
             "uid": current.get("uid", ""),
             "position": position,
             "device": device,
@@ -545,15 +947,591 @@ async def stop_reader_playback(
         # Don't clear current_tag - keep Now Playing visible in paused state
     else:
         # Manual stop (X button) - fully stop and clear everything
-        state["current_tag"] = None
-        state["current_started_at"] = None
-        state["current_offset"] = 0.0
-        state["last_reported_position"] = 0.0
-        state["current_device"] = None
+        set_current_tag(state, None)
+        state.current_started_at = None
+        state.current_offset = 0.0
+        state.last_reported_position = 0.0
+        state.current_device = None
         await device_service.stop_device(device)
         logger.info(f"Stopped playback for reader {reader_ip} on device {device}")
 
 
+async def _link_rfid_and_clear_pending(
+    espuino_ip: str,
+    tag_id: str,
+    folder_path: str,
+    session: aiohttp.ClientSession | None = None,
+) -> None:
+    """Map the tag to its SD folder and drop the finished upload intent.
+
+    The queue file is rewritten while the RFID mapping request is in flight.
+    """
+    rfid_task = None
+    if tag_id:
+        rfid_task = asyncio.create_task(
+            device_service.set_espuino_rfid_mapping(
+                espuino_ip, tag_id, folder_path, play_mode=5, session=session
+            )
+        )
+    device_service.clear_pending_upload(espuino_ip)
+    if rfid_task is None:
+        return
+    if await rfid_task:
+        logger.info(f"RFID mapping updated for {tag_id} -> {folder_path}")
+    else:
+        logger.warning(f"Failed to update RFID mapping for {tag_id}")
+
+
+@dataclass(frozen=True, slots=True)
+class UploadCtx:
+    """A tonie to copy onto an ESPuino SD card after playback has started."""
+
+    reader_device: dict
+    uid: str
+    title: str
+    series: str
+    episode: str
+    audio_url: str
+    tonie_tracks: list[dict]
+    has_tracks: bool = True
+    mp3_path: Path | None = None  # Legacy single-file upload only
+    finished_q: asyncio.Queue | None = None  # Track indices from the encoder
+
+
+@dataclass(frozen=True, slots=True)
+class UploadItem:
+    """One cached track and where it goes on the SD card."""
+
+    index: int
+    name: str
+    source_path: Path
+    dest_path: str
+
+
+async def upload_to_sd(ctx: UploadCtx) -> None:
+    """Upload a tonie's tracks, metadata and uid_map to the reader's SD card."""
+    reader_device, uid, title = ctx.reader_device, ctx.uid, ctx.title
+    series, episode = ctx.series, ctx.episode
+    audio_url, tonie_tracks = ctx.audio_url, ctx.tonie_tracks
+    has_tracks, mp3_path, finished_q = ctx.has_tracks, ctx.mp3_path, ctx.finished_q
+    uid_map_path = build_espuino_uid_map_path(uid)
+    tag_id = uid_to_espuino_tag_id(uid)
+    if not tag_id:
+        logger.debug(f"No ESPuino tag id for {uid}, RFID link will be skipped")
+
+    try:
+        espuino_ip = reader_device.get("id")
+        espuino_session = device_service.get_espuino_session()
+        throttle_kbps = device_service.ESPUINO_UPLOAD_MAX_KBPS_ACTIVE
+
+        # Resolve every track's source and SD path once for all upload passes
+        items: list[UploadItem] = []
+        for i, t in enumerate(tonie_tracks):
+            name = _track_name(t, i)
+            items.append(
+                UploadItem(
+                    i,
+                    name,
+                    get_track_cache_path(audio_url, i),
+                    build_espuino_dest_path(uid, series, episode, i, name)[1],
+                )
+            )
+        upload_slots = asyncio.Semaphore(ESPUINO_UPLOAD_WINDOW)
+        # One bandwidth budget for everything uploading to this ESPuino
+        upload_limiter = device_service.get_upload_rate_limiter(
+            espuino_ip, throttle_kbps * 1024
+        )
+
+        async def upload_track(seq: int, i: int, total: int) -> bool:
+            item = items[i]
+
+            async with upload_slots:
+                logger.info(
+                    f"Uploading track {seq}/{total} to ESPuino: {item.dest_path}"
+                )
+                result = await device_service.upload_to_espuino(
+                    espuino_ip,
+                    item.source_path,
+                    item.dest_path,
+                    title=f"{title} - Track {i + 1}",
+                    track_index=seq,
+                    total_tracks=total,
+                    max_kbps=throttle_kbps,
+                    session=espuino_session,
+                    rate_limiter=upload_limiter,
+                )
+                if result.get("success"):
+                    # Unthrottled: small delay before freeing the slot to let
+                    # ESPuino process (the shared limiter paces throttled uploads)
+                    if upload_limiter is None and seq < total:
+                        await asyncio.sleep(2)
+                    return True
+            logger.warning(f"Track {i + 1} upload failed: {result.get('error')}")
+            return False
+
+        if has_tracks:
+            # Build human-readable folder name
+            dest_folder, _ = build_espuino_dest_path(uid, series, episode)
+
+            # Check for partial uploads first - use size verification
+            # This detects broken/incomplete files from cancelled uploads,
+            # and runs before streaming so tracks already on the card
+            # aren't uploaded again as the encoder finishes them
+            existing_check = await device_service.verify_espuino_upload(
+                espuino_ip,
+                dest_folder,
+                uid_map_path=uid_map_path,
+                session=espuino_session,
+            )
+            if existing_check.get("metadata"):
+                missing = existing_check.get("missing_tracks", [])
+                mismatch = existing_check.get("size_mismatch", [])
+                needs_upload = missing + mismatch
+            else:
+                # Fresh upload - all tracks need uploading
+                needs_upload = list(range(len(tonie_tracks)))
+
+        # Fresh encode: upload each track as soon as the
+        # background encoder has cached it
+        streamed: set[int] = set()
+        if has_tracks and finished_q is not None:
+            stream_tasks = {}
+            try:
+                while (
+                    i := await asyncio.wait_for(finished_q.get(), timeout=600)
+                ) is not None:
+                    if i not in needs_upload:
+                        continue
+                    stream_tasks[i] = asyncio.create_task(
+                        upload_track(i + 1, i, len(tonie_tracks))
+                    )
+            except asyncio.TimeoutError:
+                logger.warning("Timed out waiting for encoded tracks")
+            results = await asyncio.gather(
+                *stream_tasks.values(),
+                return_exceptions=True,
+            )
+            for i, r in zip(stream_tasks, results):
+                if r is True:
+                    streamed.add(i)
+                elif isinstance(r, Exception):
+                    logger.warning(f"Track upload error: {r}")
+            logger.info(
+                f"Uploaded {len(streamed)}/{len(tonie_tracks)} tracks while encoding"
+            )
+
+        # Wait for encoding to fully complete before the metadata and
+        # remaining uploads (returns at once after a streamed encode)
+        # Status must be "cached" or "ready" - NOT just "not encoding"
+        # "partial" status means only some tracks exist, sizes would be 0
+        if has_tracks:
+            encoding_status = await wait_for_encoding(audio_url, timeout=600)
+            final_status = encoding_status.get("status")
+            if final_status == "error":
+                logger.error(
+                    f"Encoding failed: {encoding_status.get('error', 'unknown')}, skipping upload"
+                )
+                return
+            elif final_status not in ("cached", "ready"):
+                logger.warning(
+                    f"Encoding timeout (status={final_status}) - proceeding with partial upload"
+                )
+            else:
+                logger.info(
+                    f"Encoding complete (status={final_status}), starting upload"
+                )
+
+        if has_tracks:
+            # Stat all cached tracks once, off the event loop
+            track_sizes = await _stat_track_sizes(audio_url, len(tonie_tracks))
+
+            # Queue upload intent for persistence (survives restarts)
+            # A re-tap resuming the same tonie reuses the queued intent
+            queued_intent = device_service.get_pending_upload(espuino_ip)
+            if not (
+                queued_intent
+                and queued_intent.get("audio_url") == audio_url
+                and queued_intent.get("folder_path") == dest_folder
+            ):
+                upload_intent = {
+                    "uid": uid,
+                    "series": series,
+                    "episode": episode,
+                    "folder_path": dest_folder,
+                    "audio_url": audio_url,
+                    "tracks": [
+                        {
+                            "index": item.index,
+                            "name": item.name,
+                            "source_path": str(item.source_path),
+                            "dest_path": item.dest_path,
+                        }
+                        for item in items
+                    ],
+                }
+                device_service.queue_upload(espuino_ip, upload_intent)
+
+            # Build metadata with file sizes
+            metadata = build_upload_metadata(
+                uid,
+                series,
+                episode,
+                tonie_tracks,
+                audio_url,
+                sizes=track_sizes,
+            )
+
+            # Clear any previous errors for this upload folder
+            # This handles the "cancelled upload, errors persist" case
+            device_service.clear_uploads_for_espuino(espuino_ip)
+
+            # Build the uid_map once for every upload path below
+            uid_map = {
+                "uid": uid,
+                "folder": dest_folder,
+                "title": title,
+                "series": series,
+                "episode": episode,
+                "files": _build_uid_map_files(
+                    [item.dest_path for item in items], track_sizes
+                ),
+            }
+
+            async def upload_uid_map() -> dict:
+                result = await _upload_uid_map(
+                    espuino_ip,
+                    uid_map,
+                    uid_map_path,
+                    title,
+                    total_tracks=len(tonie_tracks),
+                    max_kbps=throttle_kbps,
+                    skip_unchanged=True,
+                    session=espuino_session,
+                )
+                if result.get("success"):
+                    logger.info(f"Uploaded UID map (pre-upload): {uid_map_path}")
+                else:
+                    logger.warning(f"UID map pre-upload failed: {result.get('error')}")
+                return result
+
+            # The uid_map doesn't depend on what's on the card, so
+            # overlap its upload with the track uploads
+            uid_map_task = asyncio.create_task(upload_uid_map())
+
+            if existing_check.get("metadata"):
+                # Folder exists - resume partial upload
+                verified = existing_check.get("verified_tracks", 0)
+                total = existing_check.get("total_tracks", 0)
+                if needs_upload:
+                    logger.info(
+                        f"Resuming partial upload: {verified}/{total} tracks OK, {len(needs_upload)} need upload"
+                    )
+                else:
+                    logger.info(
+                        f"Upload already complete: {verified}/{total} tracks verified"
+                    )
+                    uid_map_result = await uid_map_task
+                    uid_map_exists = uid_map_result.get("success")
+                    if not uid_map_exists:
+                        uid_map_exists = _uid_map_recently_seen(
+                            espuino_ip, uid_map_path
+                        )
+                    if not uid_map_exists:
+                        uid_map_exists = await device_service.check_espuino_file_exists(
+                            espuino_ip,
+                            uid_map_path,
+                            session=espuino_session,
+                        )
+                        if uid_map_exists:
+                            _uid_map_seen[(espuino_ip, uid_map_path)] = time.time()
+                    if not uid_map_exists:
+                        logger.info(
+                            f"UID map missing for {uid}, uploading: {uid_map_path}"
+                        )
+                        await _upload_uid_map(
+                            espuino_ip,
+                            uid_map,
+                            uid_map_path,
+                            title,
+                            total_tracks=len(tonie_tracks),
+                            max_kbps=throttle_kbps,
+                            session=espuino_session,
+                        )
+                    device_service.clear_pending_upload(espuino_ip)
+                    return
+
+            # Tracks uploaded while encoding are checked by
+            # the verification pass below instead
+            pending = [
+                i for i in needs_upload if i < len(tonie_tracks) and i not in streamed
+            ]
+            skipped_count = max(
+                0,
+                len(tonie_tracks) - len(pending) - len(streamed),
+            )
+            # metadata already carries track_sizes; a zero size
+            # means the track never made it into the cache
+            upload_indices = [i for i in pending if track_sizes[i] > 0]
+            for i in pending:
+                if not track_sizes[i]:
+                    logger.warning(f"Track {i + 1} missing from cache, cannot upload")
+            # Keep up to ESPUINO_UPLOAD_WINDOW track uploads in flight
+            results = await asyncio.gather(
+                *[
+                    upload_track(seq, i, len(upload_indices))
+                    for seq, i in enumerate(upload_indices, start=1)
+                ],
+                return_exceptions=True,
+            )
+            uploaded_count = len(streamed) + sum(1 for r in results if r is True)
+            for r in results:
+                if isinstance(r, Exception):
+                    logger.warning(f"Track upload error: {r}")
+            uid_map_success = (await uid_map_task).get("success", False)
+
+            if skipped_count > 0:
+                logger.info(f"Skipped {skipped_count} already-verified tracks")
+
+            logger.info(
+                f"ESPuino SD upload complete: {uploaded_count}/{len(streamed) + len(upload_indices)} tracks"
+            )
+
+            # Verify upload against the local manifest and re-upload
+            # missing/corrupt files; metadata.json goes up once afterwards
+            if upload_indices or streamed:
+                verification = await device_service.verify_espuino_upload(
+                    espuino_ip,
+                    dest_folder,
+                    session=espuino_session,
+                    expected=metadata,
+                )
+            else:
+                # Nothing was written since the pre-upload check
+                logger.info("No tracks uploaded, reusing pre-upload verification")
+                verification = existing_check
+            retry_uploads = []
+            if not verification.get("complete"):
+                missing = verification.get("missing_tracks", [])
+                mismatch = verification.get("size_mismatch", [])
+                retry_indices = [
+                    i for i in (missing + mismatch) if i < len(tonie_tracks)
+                ]
+                if retry_indices:
+                    logger.warning(
+                        f"Verification failed: {len(retry_indices)} tracks need re-upload"
+                    )
+                    retry_uploads = [i for i in retry_indices if track_sizes[i]]
+
+                    async def replace_track(i: int) -> bool:
+                        # Delete a corrupted file right before its own re-upload
+                        if i in mismatch:
+                            bad_path = items[i].dest_path
+                            if await device_service.delete_espuino_file(
+                                espuino_ip,
+                                bad_path,
+                                session=espuino_session,
+                            ):
+                                logger.info(f"Deleted corrupted file: {bad_path}")
+                            else:
+                                logger.warning(
+                                    f"Failed to delete corrupted file: {bad_path}"
+                                )
+                        if not track_sizes[i]:
+                            return False
+                        seq = retry_uploads.index(i) + 1
+                        return await upload_track(seq, i, len(retry_uploads))
+
+                    # Each track runs delete -> re-upload as one chain, through
+                    # the same window and shared limiter as the first pass
+                    await asyncio.gather(
+                        *[replace_track(i) for i in retry_indices],
+                        return_exceptions=True,
+                    )
+
+            # Upload metadata.json once, after the tracks (and any retries)
+            if uploaded_count > 0 or retry_uploads:
+                metadata_path = f"{dest_folder}/metadata.json"
+                result = await device_service.upload_to_espuino(
+                    espuino_ip,
+                    await asyncio.to_thread(_json_bytes, metadata),
+                    metadata_path,
+                    title=f"{title} - metadata",
+                    total_tracks=max(1, len(upload_indices) + len(retry_uploads)),
+                    max_kbps=throttle_kbps,
+                    is_aux=True,
+                    session=espuino_session,
+                )
+                if result.get("success"):
+                    logger.info(f"Uploaded metadata.json to {metadata_path}")
+                else:
+                    logger.warning(f"Metadata upload failed: {result.get('error')}")
+
+            if verification.get("complete"):
+                logger.info(
+                    f"Upload verified: all {verification.get('total_tracks')} tracks OK"
+                )
+                if not uid_map_success:
+                    logger.warning(
+                        f"UID map missing or failed, retrying upload: {uid_map_path}"
+                    )
+                    retry = await _upload_uid_map(
+                        espuino_ip,
+                        uid_map,
+                        uid_map_path,
+                        title,
+                        total_tracks=len(tonie_tracks),
+                        max_kbps=throttle_kbps,
+                        session=espuino_session,
+                    )
+                    uid_map_success = retry.get("success", False)
+                if uid_map_success:
+                    # Auto-link RFID to local folder after verification
+                    # and clear pending upload queue - upload complete!
+                    await _link_rfid_and_clear_pending(
+                        espuino_ip,
+                        tag_id,
+                        verification.get("folder") or dest_folder,
+                        session=espuino_session,
+                    )
+                else:
+                    logger.warning(
+                        f"UID map still missing; keeping pending upload for retry on next heartbeat"
+                    )
+        elif mp3_path:
+            # Legacy single-file upload (use human-readable path)
+            _, dest_path = build_espuino_dest_path(uid, series, episode)
+            if await device_service.check_espuino_file_exists(
+                espuino_ip,
+                dest_path,
+                session=espuino_session,
+            ):
+                logger.info(f"File already on ESPuino SD: {dest_path}")
+                return
+            logger.info(f"Uploading MP3 to ESPuino {espuino_ip} SD card: {dest_path}")
+            result = await device_service.upload_to_espuino(
+                espuino_ip,
+                mp3_path,
+                dest_path,
+                title=title,
+                track_index=1,
+                total_tracks=1,
+                max_kbps=throttle_kbps,
+                session=espuino_session,
+            )
+            if result.get("success"):
+                logger.info(f"ESPuino SD upload complete: {dest_path}")
+                uid_map = {
+                    "uid": uid,
+                    "folder": str(Path(dest_path).parent),
+                    "title": title,
+                    "series": series,
+                    "episode": episode,
+                    "files": [
+                        {
+                            "index": 0,
+                            "name": Path(dest_path).name,
+                            "size": mp3_path.stat().st_size if mp3_path.exists() else 0,
+                        }
+                    ],
+                }
+                map_result = await _upload_uid_map(
+                    espuino_ip,
+                    uid_map,
+                    uid_map_path,
+                    title,
+                    max_kbps=throttle_kbps,
+                    session=espuino_session,
+                )
+                if map_result.get("success"):
+                    logger.info(f"Uploaded UID map: {uid_map_path}")
+                else:
+                    logger.warning(f"UID map upload failed: {map_result.get('error')}")
+            else:
+                logger.warning(f"ESPuino SD upload failed: {result.get('error')}")
+    except Exception as e:
+        logger.error(f"ESPuino SD upload error: {e}")
+
+
+async def _start_sonos_playlist(reader_device: dict, url: str, title: str) -> bool:
+    sonos_ip = device_service.get_sonos_ip_from_uid(reader_device.get("id"))
+    if not sonos_ip:
+        logger.warning(f"Could not find Sonos IP for {reader_device.get('id')}")
+        return False
+    return await device_service.play_playlist_on_sonos(sonos_ip, [url], title)
+
+
+async def _start_chromecast_playlist(reader_device: dict, url: str, title: str) -> bool:
+    return await device_service.play_playlist_on_chromecast(
+        reader_device.get("id"), [url], title
+    )
+
+
+# Devices that start on a one-track playlist which the background encoder
+# extends as each remaining track is cached
+PROGRESSIVE_PLAYERS: dict[str, Callable[[dict, str, str], Awaitable[bool]]] = {
+    "sonos": _start_sonos_playlist,
+    "chromecast": _start_chromecast_playlist,
+}
+
+
+async def _progressive_play(
+    reader_device: dict,
+    device_type: str,
+    audio_url: str,
+    server_base: str,
+    title: str,
+) -> bool:
+    """Start playback on track 1 of a tonie that is still being encoded."""
+    first_track_url = f"{server_base}/tracks/{get_tonie_cache_key(audio_url)}/01.mp3"
+    player = PROGRESSIVE_PLAYERS.get(device_type)
+    if player:
+        return await player(reader_device, first_track_url, title)
+    return await device_service.play_on_device(reader_device, first_track_url, title)
+
+
+async def _encode_remaining_tracks(
+    reader_device: dict,
+    device_type: str,
+    audio_url: str,
+    tracks: list[dict],
+    series: str,
+    episode: str,
+    cover_url: str,
+    server_base: str,
+    espuino_ip: str | None = None,
+    finished_q: asyncio.Queue | None = None,
+) -> None:
+    """Encode tracks 2..n after playback has started.
+
+    Progressive players get each track queued as it finishes. If finished_q
+    is given, it receives each cached track index and then None.
+    """
+
+    async def queue_finished(i: int, _path: Path) -> None:
+        await finished_q.put(i)
+
+    on_track_complete = queue_finished if finished_q is not None else None
+    progressive_device = reader_device if device_type in PROGRESSIVE_PLAYERS else None
+    try:
+        await continue_encoding_remaining_tracks(
+            source_url=audio_url,
+            tracks=tracks,
+            series=series,
+            episode=episode,
+            espuino_ip=espuino_ip,
+            cover_url=cover_url,
+            playback_device=progressive_device,
+            server_base_url=server_base if progressive_device else None,
+            on_track_complete=on_track_complete,
+        )
+        logger.info(f"Background encoding complete: all {len(tracks)} tracks ready")
+    except Exception as e:
+        logger.error(f"Background encoding failed: {e}")
+    finally:
+        if finished_q is not None:
+            finished_q.put_nowait(None)
+
+
 async def play_tonie_for_reader(
     reader_ip: str,
     uid: str,
@@ -563,7 +1541,9 @@ async def play_tonie_for_reader(
     metadata_override: dict[str, str] | None = None,
 ) -> "TonieResponse":
     """Handle a Tonie playback request for a specific reader."""
-    if reader_ip not in connected_readers:
+    is_virtual = _is_virtual_reader(reader_ip)
+    reader = connected_readers.get(reader_ip)
+    if reader is None:
         # Give readers friendly names based on source
         if reader_ip == "manual-stream":
             name = "Web Stream"  # Triggered from web UI (legacy)
@@ -575,41 +1555,40 @@ async def play_tonie_for_reader(
             # Physical tag scan - use ESPuino name if available
             cached = device_service.get_cached_readers().get(reader_ip, {})
             name = cached.get("name") or f"Tag Scan ({reader_ip})"
+        now = time.time()
         connected_readers[reader_ip] = {
-            "first_seen": datetime.now().isoformat(),
-            "last_seen": datetime.now().isoformat(),
+            "first_seen": now,
+            "last_seen": now,
             "scan_count": 0,
             "name": name,
         }
         # Save to persistent cache (skip virtual readers)
-        if not _is_virtual_reader(reader_ip):
+        if not is_virtual:
             device_service.update_reader_cache(
                 reader_ip, {"name": name, "scan_count": 0}
             )
     else:
-        connected_readers[reader_ip]["last_seen"] = datetime.now().isoformat()
-        # Update cache last_seen for real readers
-        if not _is_virtual_reader(reader_ip):
-            device_service.update_reader_cache(
-                reader_ip, {"last_seen": datetime.now().isoformat()}
-            )
+        reader["last_seen"] = time.time()
+        # Update cache last_seen for real readers (stamped by the cache)
+        if not is_virtual:
+            device_service.update_reader_cache(reader_ip, {})
 
     state = get_reader_state(reader_ip)
 
-    current = state.get("current_tag")
-    resume = state.get("resume")
+    current = state.current_tag
+    resume = state.resume
     if current and current.get("uid") == uid:
         # Same tag re-scanned - check if we should resume (tag was removed and returned)
         if resume and resume.get("uid") == uid and resume.get("paused"):
             # Tag was removed and placed back - resume playback
-            device = state.get(
-                "current_device"
-            ) or device_service.get_device_for_reader(reader_ip)
+            device = state.current_device or device_service.get_device_for_reader(
+                reader_ip
+            )
             resumed = await device_service.resume_device(device)
             if resumed:
-                state["resume"] = None  # Clear resume state
+                state.resume = None  # Clear resume state
                 logger.info(f"Resumed playback for {reader_ip} - tag returned")
-            return TonieResponse(
+            return TonieResponse.model_construct(
                 uid=uid,
                 series=current.get("series"),
                 episode=current.get("episode"),
@@ -620,7 +1599,7 @@ async def play_tonie_for_reader(
                 playback_url=current.get("playback_url"),
             )
         # Same tag, already playing - return current state
-        return TonieResponse(
+        return TonieResponse.model_construct(
             uid=uid,
             series=current.get("series"),
             episode=current.get("episode"),
@@ -633,8 +1612,16 @@ async def play_tonie_for_reader(
             ),  # Include URL so ESPuino doesn't play "null"
         )
 
+    # Resolve the target device once; without an override it is also what
+    # stopping the previous tag would look up
+    reader_device = device_override or device_service.get_device_for_reader(reader_ip)
+
     if current and current.get("uid") != uid:
-        await stop_reader_playback(reader_ip, save_resume=False)
+        await stop_reader_playback(
+            reader_ip,
+            save_resume=False,
+            reader_device=None if device_override else reader_device,
+        )
 
     if not teddycloud_client:
         raise HTTPException(status_code=503, detail="TeddyCloud client not initialized")
@@ -642,7 +1629,7 @@ async def play_tonie_for_reader(
     tonie = await teddycloud_client.find_tonie_by_uid(uid)
     overrides = metadata_override or {}
 
-    response = TonieResponse(
+    response = TonieResponse.model_construct(
         uid=uid,
         series=overrides.get("series") or (tonie.get("series") if tonie else None),
         episode=overrides.get("episode")
@@ -656,7 +1643,6 @@ async def play_tonie_for_reader(
     settings = get_settings()
     audio_url = build_audio_url(tonie, uid, settings)
 
-    reader_device = device_override or device_service.get_device_for_reader(reader_ip)
     device_type = reader_device.get("type", "")
     logger.info(
         f"Reader {reader_ip} using device type: {device_type}, id: {reader_device.get('id', 'none')}"
@@ -685,7 +1671,7 @@ async def play_tonie_for_reader(
         response.track_count = 1
 
     start_position = 0.0
-    resume = state.get("resume")
+    resume = state.resume
     resume_device = resume.get("device") if resume else None
     should_resume = bool(resume and resume.get("uid") == uid and resume.get("paused"))
     same_device = bool(
@@ -695,26 +1681,29 @@ async def play_tonie_for_reader(
     )
     if resume and resume.get("uid") == uid:
         start_position = float(resume.get("position", 0.0))
-        state["resume"] = None
+        state.resume = None
 
     if tonie:
-        state["current_tag"] = {
-            "uid": uid,
-            "series": response.series,
-            "episode": response.episode,
-            "title": response.title,
-            "picture": tonie.get("picture"),
-            "audio_url": audio_url,
-            "playback_url": playback_url,
-            "placed_at": datetime.now().isoformat(),
-            "start_position": start_position,
-            "duration": tonie.get("duration"),
-            "tracks": tonie.get("tracks", []),
-        }
-        state["current_started_at"] = time.time()
-        state["current_offset"] = start_position
-        state["current_device"] = reader_device
-        state["last_reported_position"] = (
+        set_current_tag(
+            state,
+            {
+                "uid": uid,
+                "series": response.series,
+                "episode": response.episode,
+                "title": response.title,
+                "picture": tonie.get("picture"),
+                "audio_url": audio_url,
+                "playback_url": playback_url,
+                "placed_at": _now_iso_cached(),
+                "start_position": start_position,
+                "duration": tonie.get("duration"),
+                "tracks": tonie.get("tracks", []),
+            },
+        )
+        state.current_started_at = time.time()
+        state.current_offset = start_position
+        state.current_device = reader_device
+        state.last_reported_position = (
             start_position if device_type == "browser" else 0.0
         )
 
@@ -742,8 +1731,8 @@ async def play_tonie_for_reader(
         logger.info(f"Track detection for {uid[:16]}: {len(tonie_tracks)} track(s)")
 
         # Update state with actual track list (may have been modified above)
-        state["current_tag"]["tracks"] = tonie_tracks
-        state["current_tag"]["track_count"] = len(tonie_tracks)
+        state.current_tag["tracks"] = tonie_tracks
+        state.current_tag["track_count"] = len(tonie_tracks)
 
         # Update response track count from TeddyCloud data (not just cached metadata)
         response.track_count = len(tonie_tracks)
@@ -756,9 +1745,7 @@ async def play_tonie_for_reader(
         if device_type == "browser":
             if has_tracks:
                 # Multi-track encoding
-                cache_dir = get_tonie_cache_dir(audio_url)
-                metadata_path = cache_dir / "metadata.json"
-                if not metadata_path.exists():
+                if not is_fully_encoded(audio_url):
                     set_encoding_status(
                         audio_url,
                         "encoding",
@@ -785,16 +1772,14 @@ async def play_tonie_for_reader(
                     except Exception as e:
                         logger.error(f"Multi-track encoding failed: {e}")
 
-                asyncio.create_task(encode_tracks_for_browser())
+                _spawn(encode_tracks_for_browser())
 
             playback_started = True  # Browser handles actual playback via web UI
-        elif device_type in ["sonos", "airplay", "chromecast", "espuino"]:
+        elif device_type in TRANSCODE_TYPES:
             # Network devices need pre-encoding, but do it in background to avoid ESP32 timeout
             # ESP32 has 5s HTTP timeout, encoding takes ~40s for new files
             # Check if cached (metadata.json = fully encoded)
-            cache_dir = get_tonie_cache_dir(audio_url)
-            metadata_path = cache_dir / "metadata.json"
-            is_cached = metadata_path.exists()
+            is_cached = is_fully_encoded(audio_url)
 
             if not is_cached:
                 set_encoding_status(
@@ -808,6 +1793,7 @@ async def play_tonie_for_reader(
                 nonlocal playback_started
                 try:
                     mp3_path = None  # Only used for legacy single-file upload
+                    finished_q = None  # Encoded track indices for the SD uploader
                     if has_tracks:
                         # Multi-track: encode first track only, start playback, then continue in background
                         logger.info(
@@ -838,72 +1824,49 @@ async def play_tonie_for_reader(
                         # Continue encoding remaining tracks in background
                         # For Sonos/Chromecast: queue tracks progressively as they encode
                         # For ESPuino: just encode (it needs full.mp3 concatenated file)
-                        progressive_device = (
-                            reader_device
-                            if device_type in ["sonos", "chromecast"]
-                            else None
-                        )
                         server_base = (
                             settings.server_url.rstrip("/")
                             if settings.server_url
                             else f"http://{get_local_ip()}:8754"
                         )
 
-                        async def encode_remaining():
-                            try:
-                                await continue_encoding_remaining_tracks(
-                                    source_url=audio_url,
-                                    tracks=tonie_tracks,
-                                    series=series,
-                                    episode=episode,
-                                    espuino_ip=espuino_ip_for_progress,
-                                    cover_url=cover_url,
-                                    playback_device=progressive_device,
-                                    server_base_url=server_base
-                                    if progressive_device
-                                    else None,
-                                )
-                                logger.info(
-                                    f"Background encoding complete: all {len(tonie_tracks)} tracks ready"
-                                )
-                            except Exception as e:
-                                logger.error(f"Background encoding failed: {e}")
+                        # For a fresh ESPuino encode, hand each finished track to the
+                        # SD uploader as soon as it's cached (None marks the end)
+                        if device_type == "espuino" and not is_cached:
+                            finished_q = asyncio.Queue()
 
-                        asyncio.create_task(encode_remaining())
+                        _spawn_encode(
+                            _encode_remaining_tracks(
+                                reader_device,
+                                device_type,
+                                audio_url,
+                                tonie_tracks,
+                                series,
+                                episode,
+                                cover_url,
+                                server_base,
+                                espuino_ip=espuino_ip_for_progress,
+                                finished_q=finished_q,
+                            ),
+                            audio_url,
+                            coalesce=device_type not in PROGRESSIVE_PLAYERS
+                            and finished_q is None,
+                        )
 
                     logger.info(f"Starting playback on {device_type}")
 
                     # Now start playback
                     sd_playback = False  # Track if we're playing from SD
 
-                    if has_tracks and device_type in ["sonos", "chromecast"]:
+                    if has_tracks and device_type in PROGRESSIVE_PLAYERS:
                         # Progressive playback: start with track 1 immediately
                         # Background encoder will queue remaining tracks as they complete
-                        cache_key = get_tonie_cache_key(audio_url)
-                        first_track_url = f"{server_base}/tracks/{cache_key}/01.mp3"
-
                         logger.info(
                             f"Starting progressive playback on {device_type}: track 1 of {len(tonie_tracks)}"
                         )
-
-                        # Clear queue and start with first track
-                        if device_type == "sonos":
-                            sonos_ip = device_service.get_sonos_ip_from_uid(
-                                reader_device.get("id")
-                            )
-                            if sonos_ip:
-                                started = await device_service.play_playlist_on_sonos(
-                                    sonos_ip, [first_track_url], title
-                                )
-                            else:
-                                logger.warning(
-                                    f"Could not find Sonos IP for {reader_device.get('id')}"
-                                )
-                                started = False
-                        else:  # chromecast
-                            started = await device_service.play_playlist_on_chromecast(
-                                reader_device.get("id"), [first_track_url], title
-                            )
+                        started = await _progressive_play(
+                            reader_device, device_type, audio_url, server_base, title
+                        )
 
                         if started:
                             logger.info(
@@ -966,660 +1929,32 @@ async def play_tonie_for_reader(
                         # Skip if already playing from SD (files complete)
                         # Skip for virtual readers (web-initiated streams)
                         # Skip in stream mode (playing on Sonos/etc, not ESPuino)
-                        is_physical_tag = not _is_virtual_reader(reader_ip)
+                        is_physical_tag = not is_virtual
                         if (
                             device_type == "espuino"
                             and is_physical_tag
                             and not sd_playback
                             and not skip_sd_upload
                         ):
-
-                            async def upload_to_sd():
-                                try:
-                                    espuino_ip = reader_device.get("id")
-                                    import json
-                                    import tempfile
-
-                                    # Wait for encoding to fully complete before starting upload
-                                    # Status must be "cached" or "ready" - NOT just "not encoding"
-                                    # "partial" status means only some tracks exist, sizes would be 0
-                                    if has_tracks:
-                                        encoding_status = get_encoding_status(audio_url)
-                                        wait_count = 0
-                                        # Wait until status is "cached" (all tracks done) or "ready" or "error"
-                                        final_statuses = ("cached", "ready", "error")
-                                        while (
-                                            encoding_status.get("status")
-                                            not in final_statuses
-                                            and wait_count < 300
-                                        ):
-                                            await asyncio.sleep(2)
-                                            encoding_status = get_encoding_status(
-                                                audio_url
-                                            )
-                                            wait_count += 1
-                                            if wait_count % 10 == 0:
-                                                status = encoding_status.get(
-                                                    "status", "?"
-                                                )
-                                                progress = encoding_status.get(
-                                                    "progress", 0
-                                                )
-                                                logger.info(
-                                                    f"Waiting for encoding: {status} {progress:.0f}%"
-                                                )
-                                        final_status = encoding_status.get("status")
-                                        if final_status == "error":
-                                            logger.error(
-                                                f"Encoding failed: {encoding_status.get('error', 'unknown')}, skipping upload"
-                                            )
-                                            return
-                                        elif final_status not in ("cached", "ready"):
-                                            logger.warning(
-                                                f"Encoding timeout (status={final_status}) - proceeding with partial upload"
-                                            )
-                                        else:
-                                            logger.info(
-                                                f"Encoding complete (status={final_status}), starting upload"
-                                            )
-
-                                    if has_tracks:
-                                        # Build human-readable folder name
-                                        dest_folder, _ = build_espuino_dest_path(
-                                            uid, series, episode
-                                        )
-
-                                        # Queue upload intent for persistence (survives restarts)
-                                        upload_intent = {
-                                            "uid": uid,
-                                            "series": series,
-                                            "episode": episode,
-                                            "folder_path": dest_folder,
-                                            "audio_url": audio_url,
-                                            "tracks": [
-                                                {
-                                                    "index": i,
-                                                    "name": t.get(
-                                                        "name", f"Track {i + 1}"
-                                                    ),
-                                                    "source_path": str(
-                                                        get_track_cache_path(
-                                                            audio_url, i
-                                                        )
-                                                    ),
-                                                    "dest_path": build_espuino_dest_path(
-                                                        uid,
-                                                        series,
-                                                        episode,
-                                                        i,
-                                                        t.get("name"),
-                                                    )[1],
-                                                }
-                                                for i, t in enumerate(tonie_tracks)
-                                            ],
-                                        }
-                                        device_service.queue_upload(
-                                            espuino_ip, upload_intent
-                                        )
-
-                                        # Build metadata with file sizes
-                                        metadata = build_upload_metadata(
-                                            uid,
-                                            series,
-                                            episode,
-                                            tonie_tracks,
-                                            audio_url,
-                                        )
-
-                                        # Clear any previous errors for this upload folder
-                                        # This handles the "cancelled upload, errors persist" case
-                                        device_service.clear_uploads_for_espuino(
-                                            espuino_ip
-                                        )
-
-                                        # Check for partial uploads first - use size verification
-                                        # This detects broken/incomplete files from cancelled uploads
-                                        existing_check = (
-                                            await device_service.verify_espuino_upload(
-                                                espuino_ip,
-                                                dest_folder,
-                                                uid_map_path=build_espuino_uid_map_path(
-                                                    uid
-                                                ),
-                                            )
-                                        )
-                                        if existing_check.get("metadata"):
-                                            # Folder exists - resume partial upload
-                                            verified = existing_check.get(
-                                                "verified_tracks", 0
-                                            )
-                                            total = existing_check.get(
-                                                "total_tracks", 0
-                                            )
-                                            missing = existing_check.get(
-                                                "missing_tracks", []
-                                            )
-                                            mismatch = existing_check.get(
-                                                "size_mismatch", []
-                                            )
-                                            needs_upload = missing + mismatch
-                                            if needs_upload:
-                                                logger.info(
-                                                    f"Resuming partial upload: {verified}/{total} tracks OK, {len(needs_upload)} need upload"
-                                                )
-                                            else:
-                                                logger.info(
-                                                    f"Upload already complete: {verified}/{total} tracks verified"
-                                                )
-                                                uid_map_path = (
-                                                    build_espuino_uid_map_path(uid)
-                                                )
-                                                uid_map_exists = await device_service.check_espuino_file_exists(
-                                                    espuino_ip, uid_map_path
-                                                )
-                                                if not uid_map_exists:
-                                                    logger.info(
-                                                        f"UID map missing for {uid}, uploading: {uid_map_path}"
-                                                    )
-                                                    active_kbps = int(
-                                                        os.getenv(
-                                                            "ESPUINO_UPLOAD_MAX_KBPS_ACTIVE",
-                                                            "200",
-                                                        )
-                                                    )
-                                                    uid_map = {
-                                                        "uid": uid,
-                                                        "folder": dest_folder,
-                                                        "title": title,
-                                                        "series": series,
-                                                        "episode": episode,
-                                                        "files": [
-                                                            {
-                                                                "index": i,
-                                                                "name": build_espuino_dest_path(
-                                                                    uid,
-                                                                    series,
-                                                                    episode,
-                                                                    i,
-                                                                    t.get("name"),
-                                                                )[1].split("/")[-1],
-                                                                "size": get_track_cache_path(
-                                                                    audio_url, i
-                                                                )
-                                                                .stat()
-                                                                .st_size
-                                                                if get_track_cache_path(
-                                                                    audio_url, i
-                                                                ).exists()
-                                                                else 0,
-                                                            }
-                                                            for i, t in enumerate(
-                                                                tonie_tracks
-                                                            )
-                                                        ],
-                                                    }
-                                                    import tempfile
-                                                    import json
-
-                                                    with tempfile.NamedTemporaryFile(
-                                                        mode="w",
-                                                        suffix=".json",
-                                                        delete=False,
-                                                    ) as f:
-                                                        json.dump(uid_map, f, indent=2)
-                                                        temp_uid_map = Path(f.name)
-                                                    try:
-                                                        await device_service.upload_to_espuino(
-                                                            espuino_ip,
-                                                            temp_uid_map,
-                                                            uid_map_path,
-                                                            title=f"{title} - uid-map",
-                                                            total_tracks=len(
-                                                                tonie_tracks
-                                                            ),
-                                                            max_kbps=active_kbps,
-                                                            is_aux=True,
-                                                        )
-                                                    finally:
-                                                        temp_uid_map.unlink(
-                                                            missing_ok=True
-                                                        )
-                                                device_service.clear_pending_upload(
-                                                    espuino_ip
-                                                )
-                                                return
-                                        else:
-                                            # Fresh upload - all tracks need uploading
-                                            needs_upload = list(
-                                                range(len(tonie_tracks))
-                                            )
-
-                                        active_kbps = int(
-                                            os.getenv(
-                                                "ESPUINO_UPLOAD_MAX_KBPS_ACTIVE", "200"
-                                            )
-                                        )
-                                        idle_kbps = int(
-                                            os.getenv(
-                                                "ESPUINO_UPLOAD_MAX_KBPS_IDLE", "0"
-                                            )
-                                        )
-                                        throttle_kbps = active_kbps
-                                        uid_map_path = build_espuino_uid_map_path(uid)
-                                        uid_map_success = False
-                                        uid_map = {
-                                            "uid": uid,
-                                            "folder": dest_folder,
-                                            "title": title,
-                                            "series": series,
-                                            "episode": episode,
-                                            "files": [
-                                                {
-                                                    "index": i,
-                                                    "name": build_espuino_dest_path(
-                                                        uid,
-                                                        series,
-                                                        episode,
-                                                        i,
-                                                        t.get("name"),
-                                                    )[1].split("/")[-1],
-                                                    "size": get_track_cache_path(
-                                                        audio_url, i
-                                                    )
-                                                    .stat()
-                                                    .st_size
-                                                    if get_track_cache_path(
-                                                        audio_url, i
-                                                    ).exists()
-                                                    else 0,
-                                                }
-                                                for i, t in enumerate(tonie_tracks)
-                                            ],
-                                        }
-                                        with tempfile.NamedTemporaryFile(
-                                            mode="w", suffix=".json", delete=False
-                                        ) as f:
-                                            json.dump(uid_map, f, indent=2)
-                                            temp_uid_map = Path(f.name)
-                                        try:
-                                            result = (
-                                                await device_service.upload_to_espuino(
-                                                    espuino_ip,
-                                                    temp_uid_map,
-                                                    uid_map_path,
-                                                    title=f"{title} - uid-map",
-                                                    total_tracks=len(tonie_tracks),
-                                                    max_kbps=throttle_kbps,
-                                                    is_aux=True,
-                                                )
-                                            )
-                                            if result.get("success"):
-                                                uid_map_success = True
-                                                logger.info(
-                                                    f"Uploaded UID map (pre-upload): {uid_map_path}"
-                                                )
-                                            else:
-                                                logger.warning(
-                                                    f"UID map pre-upload failed: {result.get('error')}"
-                                                )
-                                        finally:
-                                            temp_uid_map.unlink(missing_ok=True)
-                                        for i, track in enumerate(tonie_tracks):
-                                            track_path = get_track_cache_path(
-                                                audio_url, i
-                                            )
-                                            if track_path.exists():
-                                                metadata["tracks"][i]["size"] = (
-                                                    track_path.stat().st_size
-                                                )
-
-                                        upload_indices = [
-                                            i
-                                            for i in needs_upload
-                                            if i < len(tonie_tracks)
-                                        ]
-                                        uploaded_count = 0
-                                        skipped_count = max(
-                                            0, len(tonie_tracks) - len(upload_indices)
-                                        )
-                                        for seq, i in enumerate(
-                                            upload_indices, start=1
-                                        ):
-                                            track = tonie_tracks[i]
-                                            track_path = get_track_cache_path(
-                                                audio_url, i
-                                            )
-                                            if not track_path.exists():
-                                                logger.warning(
-                                                    f"Track {i + 1} missing from cache, cannot upload"
-                                                )
-                                                continue
-
-                                            track_name = track.get(
-                                                "name", f"Track {i + 1}"
-                                            )
-                                            _, dest_path = build_espuino_dest_path(
-                                                uid, series, episode, i, track_name
-                                            )
-
-                                            logger.info(
-                                                f"Uploading track {seq}/{len(upload_indices)} to ESPuino: {dest_path}"
-                                            )
-                                            result = (
-                                                await device_service.upload_to_espuino(
-                                                    espuino_ip,
-                                                    track_path,
-                                                    dest_path,
-                                                    title=f"{title} - Track {i + 1}",
-                                                    track_index=seq,
-                                                    total_tracks=len(upload_indices),
-                                                    max_kbps=throttle_kbps,
-                                                )
-                                            )
-                                            if result.get("success"):
-                                                uploaded_count += 1
-                                                # Small delay between uploads to let ESPuino process
-                                                if seq < len(upload_indices):
-                                                    await asyncio.sleep(2)
-                                            else:
-                                                logger.warning(
-                                                    f"Track {i + 1} upload failed: {result.get('error')}"
-                                                )
-
-                                        if skipped_count > 0:
-                                            logger.info(
-                                                f"Skipped {skipped_count} already-verified tracks"
-                                            )
-
-                                        # Upload metadata.json after all tracks
-                                        if uploaded_count > 0:
-                                            metadata_path = (
-                                                f"{dest_folder}/metadata.json"
-                                            )
-                                            # Create temp file with metadata
-                                            with tempfile.NamedTemporaryFile(
-                                                mode="w", suffix=".json", delete=False
-                                            ) as f:
-                                                json.dump(metadata, f, indent=2)
-                                                temp_metadata = Path(f.name)
-                                            try:
-                                                result = await device_service.upload_to_espuino(
-                                                    espuino_ip,
-                                                    temp_metadata,
-                                                    metadata_path,
-                                                    title=f"{title} - metadata",
-                                                    total_tracks=max(
-                                                        1, len(upload_indices)
-                                                    ),
-                                                    max_kbps=throttle_kbps,
-                                                    is_aux=True,
-                                                )
-                                                if result.get("success"):
-                                                    logger.info(
-                                                        f"Uploaded metadata.json to {metadata_path}"
-                                                    )
-                                                else:
-                                                    logger.warning(
-                                                        f"Metadata upload failed: {result.get('error')}"
-                                                    )
-                                            finally:
-                                                temp_metadata.unlink(missing_ok=True)
-
-                                        logger.info(
-                                            f"ESPuino SD upload complete: {uploaded_count}/{len(upload_indices)} tracks"
-                                        )
-
-                                        # Verify upload and re-upload missing/corrupt files
-                                        verification = (
-                                            await device_service.verify_espuino_upload(
-                                                espuino_ip,
-                                                dest_folder,
-                                                uid_map_path=build_espuino_uid_map_path(
-                                                    uid
-                                                ),
-                                            )
-                                        )
-                                        if not verification.get("complete"):
-                                            missing = verification.get(
-                                                "missing_tracks", []
-                                            )
-                                            mismatch = verification.get(
-                                                "size_mismatch", []
-                                            )
-                                            retry_indices = [
-                                                i
-                                                for i in (missing + mismatch)
-                                                if i < len(tonie_tracks)
-                                            ]
-                                            if retry_indices:
-                                                logger.warning(
-                                                    f"Verification failed: {len(retry_indices)} tracks need re-upload"
-                                                )
-                                                # Delete corrupted files before re-upload
-                                                for i in mismatch:
-                                                    if i < len(tonie_tracks):
-                                                        track = tonie_tracks[i]
-                                                        track_name = track.get(
-                                                            "name", f"Track {i + 1}"
-                                                        )
-                                                        _, bad_path = (
-                                                            build_espuino_dest_path(
-                                                                uid,
-                                                                series,
-                                                                episode,
-                                                                i,
-                                                                track_name,
-                                                            )
-                                                        )
-                                                        if await device_service.delete_espuino_file(
-                                                            espuino_ip, bad_path
-                                                        ):
-                                                            logger.info(
-                                                                f"Deleted corrupted file: {bad_path}"
-                                                            )
-                                                        else:
-                                                            logger.warning(
-                                                                f"Failed to delete corrupted file: {bad_path}"
-                                                            )
-                                                for seq, i in enumerate(
-                                                    retry_indices, start=1
-                                                ):
-                                                    track = tonie_tracks[i]
-                                                    track_path = get_track_cache_path(
-                                                        audio_url, i
-                                                    )
-                                                    track_name = track.get(
-                                                        "name", f"Track {i + 1}"
-                                                    )
-                                                    _, dest_path = (
-                                                        build_espuino_dest_path(
-                                                            uid,
-                                                            series,
-                                                            episode,
-                                                            i,
-                                                            track_name,
-                                                        )
-                                                    )
-                                                    if track_path.exists():
-                                                        metadata["tracks"][i][
-                                                            "size"
-                                                        ] = track_path.stat().st_size
-                                                        logger.info(
-                                                            f"Re-uploading track {seq}/{len(retry_indices)}: {track_name}"
-                                                        )
-                                                        await device_service.upload_to_espuino(
-                                                            espuino_ip,
-                                                            track_path,
-                                                            dest_path,
-                                                            title=f"{title} - {track_name}",
-                                                            track_index=seq,
-                                                            total_tracks=len(
-                                                                retry_indices
-                                                            ),
-                                                            max_kbps=throttle_kbps,
-                                                        )
-                                                # Re-upload metadata
-                                                with tempfile.NamedTemporaryFile(
-                                                    mode="w",
-                                                    suffix=".json",
-                                                    delete=False,
-                                                ) as f:
-                                                    json.dump(metadata, f, indent=2)
-                                                    temp_metadata = Path(f.name)
-                                                try:
-                                                    await device_service.upload_to_espuino(
-                                                        espuino_ip,
-                                                        temp_metadata,
-                                                        metadata_path,
-                                                        title=f"{title} - metadata",
-                                                        total_tracks=len(retry_indices),
-                                                        max_kbps=throttle_kbps,
-                                                        is_aux=True,
-                                                    )
-                                                finally:
-                                                    temp_metadata.unlink(
-                                                        missing_ok=True
-                                                    )
-                                        else:
-                                            logger.info(
-                                                f"Upload verified: all {verification.get('total_tracks')} tracks OK"
-                                            )
-                                            if not uid_map_success:
-                                                logger.warning(
-                                                    f"UID map missing or failed, retrying upload: {uid_map_path}"
-                                                )
-                                                with tempfile.NamedTemporaryFile(
-                                                    mode="w",
-                                                    suffix=".json",
-                                                    delete=False,
-                                                ) as f:
-                                                    json.dump(uid_map, f, indent=2)
-                                                    temp_uid_map = Path(f.name)
-                                                try:
-                                                    retry = await device_service.upload_to_espuino(
-                                                        espuino_ip,
-                                                        temp_uid_map,
-                                                        uid_map_path,
-                                                        title=f"{title} - uid-map",
-                                                        total_tracks=len(tonie_tracks),
-                                                        max_kbps=throttle_kbps,
-                                                        is_aux=True,
-                                                    )
-                                                    uid_map_success = retry.get(
-                                                        "success", False
-                                                    )
-                                                finally:
-                                                    temp_uid_map.unlink(missing_ok=True)
-                                            if uid_map_success:
-                                                # Auto-link RFID to local folder after verification
-                                                folder_for_link = (
-                                                    verification.get("folder")
-                                                    or dest_folder
-                                                )
-                                                tag_id = uid_to_espuino_tag_id(uid)
-                                                if tag_id:
-                                                    if await device_service.set_espuino_rfid_mapping(
-                                                        espuino_ip,
-                                                        tag_id,
-                                                        folder_for_link,
-                                                        play_mode=5,
-                                                    ):
-                                                        logger.info(
-                                                            f"RFID mapping updated for {tag_id} -> {folder_for_link}"
-                                                        )
-                                                    else:
-                                                        logger.warning(
-                                                            f"Failed to update RFID mapping for {tag_id}"
-                                                        )
-                                                # Clear pending upload queue - upload complete!
-                                                device_service.clear_pending_upload(
-                                                    espuino_ip
-                                                )
-                                            else:
-                                                logger.warning(
-                                                    f"UID map still missing; keeping pending upload for retry on next heartbeat"
-                                                )
-                                    elif mp3_path:
-                                        # Legacy single-file upload (use human-readable path)
-                                        _, dest_path = build_espuino_dest_path(
-                                            uid, series, episode
-                                        )
-                                        if await device_service.check_espuino_file_exists(
-                                            espuino_ip, dest_path
-                                        ):
-                                            logger.info(
-                                                f"File already on ESPuino SD: {dest_path}"
-                                            )
-                                            return
-                                        logger.info(
-                                            f"Uploading MP3 to ESPuino {espuino_ip} SD card: {dest_path}"
-                                        )
-                                        result = await device_service.upload_to_espuino(
-                                            espuino_ip,
-                                            mp3_path,
-                                            dest_path,
-                                            title=title,
-                                            track_index=1,
-                                            total_tracks=1,
-                                            max_kbps=throttle_kbps,
-                                        )
-                                        if result.get("success"):
-                                            logger.info(
-                                                f"ESPuino SD upload complete: {dest_path}"
-                                            )
-                                            uid_map_path = build_espuino_uid_map_path(
-                                                uid
-                                            )
-                                            uid_map = {
-                                                "uid": uid,
-                                                "folder": str(Path(dest_path).parent),
-                                                "title": title,
-                                                "series": series,
-                                                "episode": episode,
-                                                "files": [
-                                                    {
-                                                        "index": 0,
-                                                        "name": Path(dest_path).name,
-                                                        "size": mp3_path.stat().st_size
-                                                        if mp3_path.exists()
-                                                        else 0,
-                                                    }
-                                                ],
-                                            }
-                                            with tempfile.NamedTemporaryFile(
-                                                mode="w", suffix=".json", delete=False
-                                            ) as f:
-                                                json.dump(uid_map, f, indent=2)
-                                                temp_uid_map = Path(f.name)
-                                            try:
-                                                map_result = await device_service.upload_to_espuino(
-                                                    espuino_ip,
-                                                    temp_uid_map,
-                                                    uid_map_path,
-                                                    title=f"{title} - uid-map",
-                                                    total_tracks=1,
-                                                    max_kbps=throttle_kbps,
-                                                    is_aux=True,
-                                                )
-                                                if map_result.get("success"):
-                                                    logger.info(
-                                                        f"Uploaded UID map: {uid_map_path}"
-                                                    )
-                                                else:
-                                                    logger.warning(
-                                                        f"UID map upload failed: {map_result.get('error')}"
-                                                    )
-                                            finally:
-                                                temp_uid_map.unlink(missing_ok=True)
-                                        else:
-                                            logger.warning(
-                                                f"ESPuino SD upload failed: {result.get('error')}"
-                                            )
-                                except Exception as e:
-                                    logger.error(f"ESPuino SD upload error: {e}")
-
-                            # Run upload in background (don't block playback)
-                            asyncio.create_task(upload_to_sd())
+                            # Run upload in background (don't block playback),
+                            # one at a time per ESPuino; repeat taps are coalesced
+                            upload_ctx = UploadCtx(
+                                reader_device=reader_device,
+                                uid=uid,
+                                title=title,
+                                series=series,
+                                episode=episode,
+                                audio_url=audio_url,
+                                tonie_tracks=tonie_tracks,
+                                has_tracks=has_tracks,
+                                mp3_path=mp3_path,
+                                finished_q=finished_q,
+                            )
+                            device_service.enqueue_sd_upload(
+                                reader_device.get("id"),
+                                uid,
+                                partial(upload_to_sd, upload_ctx),
+                            )
                 except Exception as e:
                     logger.error(f"Encode/play failed for {device_type}: {e}")
 
@@ -1634,7 +1969,7 @@ async def play_tonie_for_reader(
                 logger.info(
                     f"{'Tracks' if has_tracks else 'File'} NOT cached, encoding in background for {device_type}"
                 )
-                asyncio.create_task(encode_and_play())
+                _spawn(encode_and_play())
                 response.encoding = True  # Tell ESP32 encoding is in progress
 
             playback_started = True  # Return success to ESP32 immediately
@@ -1681,30 +2016,31 @@ async def play_tonie_for_reader(
             lib_tracks = [{"name": "Full Audio", "duration": 7200, "start": 0}]
             logger.warning(f"No track info for library item, using pseudo-track")
 
-        state["current_tag"] = {
-            "uid": uid,
-            "series": final_series,
-            "episode": response.episode or (metadata_override or {}).get("episode"),
-            "title": final_title,
-            "picture": cover_url,
-            "audio_url": audio_url,
-            "playback_url": playback_url,
-            "placed_at": datetime.now().isoformat(),
-            "start_position": start_position,
-            "tracks": lib_tracks,
-            "track_count": len(lib_tracks),
-        }
-        state["current_started_at"] = time.time()
-        state["current_offset"] = start_position
-        state["current_device"] = reader_device
-        state["last_reported_position"] = (
+        set_current_tag(
+            state,
+            {
+                "uid": uid,
+                "series": final_series,
+                "episode": response.episode or (metadata_override or {}).get("episode"),
+                "title": final_title,
+                "picture": cover_url,
+                "audio_url": audio_url,
+                "playback_url": playback_url,
+                "placed_at": _now_iso_cached(),
+                "start_position": start_position,
+                "tracks": lib_tracks,
+                "track_count": len(lib_tracks),
+            },
+        )
+        state.current_started_at = time.time()
+        state.current_offset = start_position
+        state.current_device = reader_device
+        state.last_reported_position = (
             start_position if device_type == "browser" else 0.0
         )
 
         # Check if already cached (metadata.json exists = fully encoded)
-        cache_dir = get_tonie_cache_dir(audio_url)
-        metadata_path = cache_dir / "metadata.json"
-        is_cached = metadata_path.exists()
+        is_cached = is_fully_encoded(audio_url)
 
         playback_started = False
 
@@ -1739,9 +2075,9 @@ async def play_tonie_for_reader(
                     except Exception as e:
                         logger.error(f"Library item encoding failed: {e}")
 
-                asyncio.create_task(encode_for_browser_lib())
+                _spawn(encode_for_browser_lib())
             playback_started = True  # Browser handles actual playback
-        elif device_type in ["sonos", "airplay", "chromecast"]:
+        elif device_type in NETWORK_PLAYER_TYPES:
             # Network devices: use progressive encoding like regular Tonie playback
             # Encode first track, start playback, then queue remaining tracks as they encode
             if not is_cached:
@@ -1771,39 +2107,18 @@ async def play_tonie_for_reader(
                         return
 
                     # Start playback immediately with first track
-                    cache_key = get_tonie_cache_key(audio_url)
                     server_base = (
                         settings.server_url.rstrip("/")
                         if settings.server_url
                         else f"http://{get_local_ip()}:8754"
                     )
-                    first_track_url = f"{server_base}/tracks/{cache_key}/01.mp3"
 
                     logger.info(
                         f"Starting progressive library playback on {device_type}: track 1 of {len(lib_tracks)}"
                     )
-
-                    if device_type == "sonos":
-                        sonos_ip = device_service.get_sonos_ip_from_uid(
-                            reader_device.get("id")
-                        )
-                        if sonos_ip:
-                            started = await device_service.play_playlist_on_sonos(
-                                sonos_ip, [first_track_url], final_title
-                            )
-                        else:
-                            logger.warning(
-                                f"Could not find Sonos IP for {reader_device.get('id')}"
-                            )
-                            started = False
-                    elif device_type == "chromecast":
-                        started = await device_service.play_playlist_on_chromecast(
-                            reader_device.get("id"), [first_track_url], final_title
-                        )
-                    else:
-                        started = await device_service.play_on_device(
-                            reader_device, first_track_url, final_title
-                        )
+                    started = await _progressive_play(
+                        reader_device, device_type, audio_url, server_base, final_title
+                    )
 
                     if started:
                         logger.info(
@@ -1812,37 +2127,25 @@ async def play_tonie_for_reader(
 
                     # Continue encoding remaining tracks in background
                     # For Sonos/Chromecast: queue tracks progressively as they encode
-                    progressive_device = (
-                        reader_device
-                        if device_type in ["sonos", "chromecast"]
-                        else None
+                    _spawn_encode(
+                        _encode_remaining_tracks(
+                            reader_device,
+                            device_type,
+                            audio_url,
+                            lib_tracks,
+                            final_series or "",
+                            (metadata_override or {}).get("episode") or "",
+                            cover_url,
+                            server_base,
+                        ),
+                        audio_url,
+                        coalesce=device_type not in PROGRESSIVE_PLAYERS,
                     )
 
-                    async def encode_remaining_lib():
-                        try:
-                            await continue_encoding_remaining_tracks(
-                                source_url=audio_url,
-                                tracks=lib_tracks,
-                                series=final_series or "",
-                                episode=(metadata_override or {}).get("episode") or "",
-                                cover_url=cover_url,
-                                playback_device=progressive_device,
-                                server_base_url=server_base
-                                if progressive_device
-                                else None,
-                            )
-                            logger.info(
-                                f"Library background encoding complete: all {len(lib_tracks)} tracks ready"
-                            )
-                        except Exception as e:
-                            logger.error(f"Library background encoding failed: {e}")
-
-                    asyncio.create_task(encode_remaining_lib())
-
                 except Exception as e:
                     logger.error(f"Library item encode/play failed: {e}")
 
-            asyncio.create_task(encode_and_play_lib())
+            _spawn(encode_and_play_lib())
             playback_started = (
                 True  # Mark as started (async will handle actual playback)
             )
@@ -1851,14 +2154,14 @@ async def play_tonie_for_reader(
         response.target = reader_device.get("id", "")
 
     if record_scan:
-        recent_scans.appendleft(
-            {
-                "time": datetime.now().isoformat(),
-                "uid": uid,
-                "reader_ip": reader_ip,
-                "found": response.found,
-                "title": response.title or response.series or "Unknown",
-            }
+        recent_scans.append(
+            ScanRecord(
+                time.time(),
+                uid,
+                reader_ip,
+                response.found,
+                response.title or response.series or "Unknown",
+            )
         )
 
     return response
@@ -1867,7 +2170,8 @@ async def play_tonie_for_reader(
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Startup/shutdown lifecycle."""
-    global teddycloud_client, _smart_ping_task
+    global teddycloud_client, _smart_ping_task, _prefs_flush_task
+    global _reader_cache_flush_task, ffmpeg_available
     settings = get_settings()
 
     # Initialize TeddyCloud client with internal URL (for audio fetching)
@@ -1888,19 +2192,39 @@ async def lifespan(app: FastAPI):
     # Load reader cache from file
     device_service.init_reader_cache()
 
+    ffmpeg_available = await asyncio.to_thread(check_ffmpeg)
+    if not ffmpeg_available:
+        logger.warning("FFmpeg not found - transcoding will fail")
+
     # Check connection
     if await teddycloud_client.check_connection():
         logger.info(f"Connected to TeddyCloud at {settings.teddycloud.url}")
     else:
         logger.warning(f"TeddyCloud not accessible at {settings.teddycloud.url}")
 
+    # Shared keep-alive session for ESPuino pings and uploads
+    device_service.get_espuino_session()
+
     # Start smart ping background task for ESPuino readers
     _smart_ping_task = asyncio.create_task(smart_ping_espuino_readers())
     logger.info("Started smart ping background task for ESPuino readers")
 
+    # Start background task that batches preference writes
+    _prefs_flush_task = asyncio.create_task(preferences_flush_loop())
+
+    # Start background task that batches reader cache writes
+    _reader_cache_flush_task = asyncio.create_task(
+        device_service.reader_cache_flush_loop()
+    )
+
     yield
 
     # Cleanup
+    for task in list(_background_tasks):
+        task.cancel()
+    await asyncio.gather(*_background_tasks, return_exceptions=True)
+    await device_service.cancel_sd_uploads()
+
     if _smart_ping_task:
         _smart_ping_task.cancel()
         try:
@@ -1908,6 +2232,24 @@ async def lifespan(app: FastAPI):
         except asyncio.CancelledError:
             pass
 
+    if _prefs_flush_task:
+        _prefs_flush_task.cancel()
+        try:
+            await _prefs_flush_task
+        except asyncio.CancelledError:
+            pass
+    flush_preferences()
+
+    if _reader_cache_flush_task:
+        _reader_cache_flush_task.cancel()
+        try:
+            await _reader_cache_flush_task
+        except asyncio.CancelledError:
+            pass
+    device_service.flush_reader_cache()
+
+    await device_service.close_espuino_session()
+
     if teddycloud_client:
         await teddycloud_client.close()
 
@@ -1917,6 +2259,9 @@ app = FastAPI(
     description="ESP32 NFC reader backend for Tonie playback control",
     version="0.1.0",
     lifespan=lifespan,
+    default_response_class=(
+        NonStrKeysORJSONResponse if orjson is not None else JSONResponse
+    ),
 )
 
 # CORS middleware - allow all origins for self-hosted deployment
@@ -1932,10 +2277,26 @@ app.add_middleware(
 # Static files for web UI (Svelte SPA)
 STATIC_DIR = Path(__file__).parent / "static"
 
+
+class HashedAssetFiles(StaticFiles):
+    """StaticFiles for content-hashed bundles, which never change in place.
+
+    Browsers may keep them for a year without revalidating; a new build
+    ships new file names.
+    """
+
+    def file_response(self, *args, **kwargs) -> Response:
+        response = super().file_response(*args, **kwargs)
+        response.headers.setdefault(
+            "Cache-Control", "public, max-age=31536000, immutable"
+        )
+        return response
+
+
 # Mount assets directory for Vite-built JS/CSS bundles
 ASSETS_DIR = STATIC_DIR / "assets"
 if ASSETS_DIR.exists():
-    app.mount("/assets", StaticFiles(directory=ASSETS_DIR), name="assets")
+    app.mount("/assets", HashedAssetFiles(directory=ASSETS_DIR), name="assets")
 
 # Also mount root static for any additional static files
 app.mount("/static", StaticFiles(directory=STATIC_DIR), name="static")
@@ -1969,6 +2330,8 @@ class TonieRequest(BaseModel):
     audio_url: str | None = None  # Direct audio URL for library items
 
 
+# Built via model_construct() from server-side values; /tonie's response_model
+# still validates it once on the way out
 class TonieResponse(BaseModel):
     uid: str = ""
     series: str | None = None
@@ -2001,13 +2364,24 @@ async def health():
 
 
 @app.get("/version")
-async def version():
+async def version(request: Request):
     """Return build version info."""
-    return {
-        "version": "1.0.0",
-        "git_commit": os.getenv("GIT_COMMIT", "dev"),
-        "build_time": os.getenv("BUILD_TIME", "unknown"),
-    }
+    return _etag_response(
+        request,
+        {
+            "version": "1.0.0",
+            "git_commit": os.getenv("GIT_COMMIT", "dev"),
+            "build_time": os.getenv("BUILD_TIME", "unknown"),
+        },
+    )
+
+
+@app.post("/debug/refresh-ffmpeg")
+async def refresh_ffmpeg():
+    """Re-probe FFmpeg availability (e.g. after installing it)."""
+    global ffmpeg_available
+    ffmpeg_available = await asyncio.to_thread(check_ffmpeg)
+    return {"ffmpeg_available": ffmpeg_available}
 
 
 @app.get("/debug")
@@ -2025,12 +2399,7 @@ async def debug_info():
 
     # Check if transcoding would be used
     active_device = device_service.get_active_device()
-    transcode_enabled = active_device.get("type") in [
-        "sonos",
-        "airplay",
-        "chromecast",
-        "espuino",
-    ]
+    transcode_enabled = active_device.get("type") in TRANSCODE_TYPES
 
     detected_ip = get_local_ip()
     effective_server_url = settings.server_url or f"http://{detected_ip}:8754"
@@ -2038,7 +2407,7 @@ async def debug_info():
     return {
         "server": {
             "status": "running",
-            "time": datetime.now().isoformat(),
+            "time": _now_iso_cached(),
             "detected_ip": detected_ip,
             "server_url": settings.server_url or "(auto-detected)",
             "effective_url": effective_server_url,
@@ -2050,23 +2419,24 @@ async def debug_info():
             "audio_url_format": audio_url_example,
         },
         "transcoding": {
-            "ffmpeg_available": check_ffmpeg(),
+            "ffmpeg_available": ffmpeg_available,
             "enabled_for_device": transcode_enabled,
             "active_device_type": active_device.get("type", "none"),
             "cache": get_cache_stats(),
         },
-        "current_tags": {
-            ip: state.get("current_tag") for ip, state in reader_states.items()
-        },
+        "current_tags": {ip: state.current_tag for ip, state in reader_states.items()},
         "default_device": device_service.get_default_device(),
         "reader_devices": get_settings().reader_devices,
         "readers": {
             "count": len(connected_readers),
-            "list": [{"ip": ip, **data} for ip, data in connected_readers.items()],
+            "list": [
+                {"ip": ip, **_readable_times(data)}
+                for ip, data in connected_readers.items()
+            ],
         },
-        "recent_scans": list(recent_scans)[:10],
+        "recent_scans": _latest_scans(10),
         "devices": device_service.get_all_devices(),
-        "logs": list(log_capture.logs)[-30:],
+        "logs": log_capture.snapshot(30),
     }
 
 
@@ -2091,42 +2461,34 @@ async def handle_tonie(request: TonieRequest, req: Request):
 
     # Use espuino_ip from request if provided, otherwise use client IP
     reader_ip = request.espuino_ip or (req.client.host if req.client else "unknown")
-    now = datetime.now()
+    now = time.time()
+    is_virtual = _is_virtual_reader(reader_ip)
 
-    if reader_ip not in connected_readers:
+    reader = connected_readers.get(reader_ip)
+    if reader is None:
         cached = device_service.get_cached_readers().get(reader_ip, {})
-        default_name = (
-            "Web Interface"
-            if _is_virtual_reader(reader_ip)
-            else f"ESPuino ({reader_ip})"
-        )
-        name = cached.get("name") or default_name
-        connected_readers[reader_ip] = {
-            "first_seen": now.isoformat(),
-            "last_seen": now.isoformat(),
+        default_name = "Web Interface" if is_virtual else f"ESPuino ({reader_ip})"
+        reader = connected_readers[reader_ip] = {
+            "first_seen": now,
+            "last_seen": now,
             "scan_count": 0,
-            "name": name,
+            "name": cached.get("name") or default_name,
         }
         logger.info(f"New reader connected: {reader_ip}")
-
-    connected_readers[reader_ip]["last_seen"] = now.isoformat()
-    if not _is_virtual_reader(reader_ip):
+    else:
+        reader["last_seen"] = now
+    if not is_virtual:
         device_service.update_reader_cache(
-            reader_ip,
-            {
-                "name": connected_readers[reader_ip]["name"],
-                "last_seen": connected_readers[reader_ip]["last_seen"],
-                "scan_count": connected_readers[reader_ip]["scan_count"],
-            },
+            reader_ip, {"name": reader["name"], "scan_count": reader["scan_count"]}
         )
 
     # Handle tag removal - pause and save position for resume
     if request.uid is None:
         logger.info(f"Tag removed from {reader_ip}")
         await stop_reader_playback(reader_ip, save_resume=True, pause_only=True)
-        return TonieResponse(uid="", found=False)
+        return TonieResponse.model_construct(uid="", found=False)
 
-    connected_readers[reader_ip]["scan_count"] += 1
+    reader["scan_count"] += 1
 
     # Check if this reader has a configured device override (non-ESPuino readers)
     # Non-ESPuino readers always stream to their configured device, ignoring mode=local
@@ -2173,9 +2535,9 @@ async def handle_tonie(request: TonieRequest, req: Request):
 
     # Store stream mode info in reader state for remote control
     state = get_reader_state(reader_ip)
-    state["mode"] = request.mode
-    state["target_device"] = device_override if request.mode == "stream" else None
-    state["espuino_ip"] = reader_ip
+    state.mode = request.mode
+    state.target_device = device_override if request.mode == "stream" else None
+    state.espuino_ip = reader_ip
 
     response = await play_tonie_for_reader(
         reader_ip,
@@ -2194,9 +2556,24 @@ async def handle_tonie(request: TonieRequest, req: Request):
 @app.get("/current")
 async def get_current_tag():
     """Get current tags for all readers."""
-    return {
-        "readers": {ip: state.get("current_tag") for ip, state in reader_states.items()}
-    }
+    return {"readers": {ip: state.current_tag for ip, state in reader_states.items()}}
+
+
+# Upper bound for one device's transport query while building /streams
+TRANSPORT_STATE_TIMEOUT = 2.0
+
+
+async def _transport_state(device: dict) -> dict | None:
+    try:
+        return await asyncio.wait_for(
+            device_service.get_device_transport_state(device),
+            timeout=TRANSPORT_STATE_TIMEOUT,
+        )
+    except asyncio.TimeoutError:
+        logger.debug(f"Transport state timed out for {device.get('id')}")
+    except Exception as e:
+        logger.debug(f"Transport state failed for {device.get('id')}: {e}")
+    return None
 
 
 @app.get("/streams")
@@ -2211,32 +2588,32 @@ async def get_streams():
     - Device transport state (playing/paused, position, duration) for Sonos/Chromecast
     """
     streams = []
+    # stream index -> in-flight transport query, awaited together below
+    transport_tasks: dict[int, asyncio.Task] = {}
+    # Readers playing the same tonie share one cache lookup per request
+    settings = get_settings()
+    track_urls_memo: dict[tuple[str, bool], list[str]] = {}
+    cached_tracks_memo: dict = {}  # audio_url -> TonieMetadata | None
 
-    for ip, state in list(reader_states.items()):
-        current = state.get("current_tag")
-        if not current:
-            continue
+    for ip, state in iter_streaming_readers():
+        current = state.current_tag
 
-        device = state.get("current_device") or device_service.get_device_for_reader(ip)
+        device = state.current_device or device_service.get_device_for_reader(ip)
 
         # Check for stale ESPuino readers (no heartbeat/smart-ping for 180+ seconds)
         # Smart ping task updates last_seen every 60s if ESPuino is still playing our tag
         # 180s timeout allows 3 ping cycles before cleanup (handles temporary network issues)
         if device.get("type") == "espuino" and not _is_virtual_reader(ip):
             reader_info = connected_readers.get(ip, {})
-            last_seen_str = reader_info.get("last_seen")
-            if last_seen_str:
-                try:
-                    last_seen = datetime.fromisoformat(last_seen_str)
-                    seconds_since = (datetime.now() - last_seen).total_seconds()
-                    if seconds_since > 180:
-                        logger.info(
-                            f"Cleaning up stale ESPuino stream: {ip} (no activity for {seconds_since:.0f}s)"
-                        )
-                        state["current_tag"] = None
-                        continue
-                except (ValueError, TypeError):
-                    pass
+            last_seen = reader_info.get("last_seen")
+            if last_seen:
+                seconds_since = time.time() - last_seen
+                if seconds_since > 180:
+                    logger.info(
+                        f"Cleaning up stale ESPuino stream: {ip} (no activity for {seconds_since:.0f}s)"
+                    )
+                    set_current_tag(state, None)
+                    continue
 
         # Get encoding status for this stream's audio URL
         audio_url = current.get("audio_url", "")
@@ -2244,10 +2621,12 @@ async def get_streams():
 
         reader_info = connected_readers.get(ip, {})
 
-        # Get device transport state (play/pause status, position) for non-browser devices
-        transport_state = None
+        # Query device transport state (play/pause status, position) for
+        # non-browser devices concurrently with the rest of the loop
         if device.get("type") not in ("browser", None, ""):
-            transport_state = await device_service.get_device_transport_state(device)
+            transport_tasks[len(streams)] = asyncio.create_task(
+                _transport_state(device)
+            )
 
         # Look up friendly device name from cache
         device_name = None
@@ -2259,15 +2638,21 @@ async def get_streams():
             device_name = device_service.get_device_name(device_type, device_id)
 
         # Build track URLs if multi-track is cached
-        settings = get_settings()
         # Use relative URLs if the active device is "browser" to avoid mixed content errors
         is_browser = device.get("type") == "browser"
-        track_urls = (
-            build_track_urls(audio_url, settings, absolute=not is_browser)
-            if audio_url
-            else []
-        )
-        cached_metadata = get_cached_tracks(audio_url) if audio_url else None
+        if audio_url:
+            urls_key = (audio_url, not is_browser)
+            track_urls = track_urls_memo.get(urls_key)
+            if track_urls is None:
+                track_urls = track_urls_memo[urls_key] = build_track_urls(
+                    audio_url, settings, absolute=not is_browser
+                )
+            if audio_url not in cached_tracks_memo:
+                cached_tracks_memo[audio_url] = get_cached_tracks(audio_url)
+            cached_metadata = cached_tracks_memo[audio_url]
+        else:
+            track_urls = []
+            cached_metadata = None
 
         # Get track info from cached metadata or from state (for progressive playback)
         state_tracks = current.get("tracks", [])
@@ -2288,7 +2673,7 @@ async def get_streams():
             track_metadata = [
                 {
                     "index": i,
-                    "name": t.get("name", f"Track {i + 1}"),
+                    "name": _track_name(t, i),
                     "duration": t.get("duration", 0),
                 }
                 for i, t in enumerate(state_tracks)
@@ -2328,10 +2713,15 @@ async def get_streams():
                     "name": device_name,
                 },
                 "encoding": encoding_info,
-                "transport": transport_state,  # Play/pause state, position, duration for Sonos/Chromecast
+                "transport": None,  # Play/pause state, position, duration for Sonos/Chromecast
             }
         )
 
+    if transport_tasks:
+        results = await asyncio.gather(*transport_tasks.values())
+        for i, transport_state in zip(transport_tasks, results):
+            streams[i]["transport"] = transport_state
+
     # Get all active uploads
     uploads = device_service.get_all_upload_status()
 
@@ -2488,16 +2878,19 @@ async def retry_failed_uploads(espuino_ip: str | None = None):
 
         # Retry upload in background
         async def do_retry(ip=ip, source=source, dest_path=dest_path, title=title):
-            idle_kbps = int(os.getenv("ESPUINO_UPLOAD_MAX_KBPS_IDLE", "0"))
             result = await device_service.upload_to_espuino(
-                ip, source, dest_path, title=title, max_kbps=idle_kbps
+                ip,
+                source,
+                dest_path,
+                title=title,
+                max_kbps=device_service.ESPUINO_UPLOAD_MAX_KBPS_IDLE,
             )
             if result.get("success"):
                 logger.info(f"Retry successful: {dest_path}")
             else:
                 logger.warning(f"Retry failed: {dest_path} - {result.get('error')}")
 
-        asyncio.create_task(do_retry())
+        _spawn(do_retry())
         retried += 1
 
     return {"status": "ok", "retried": retried}
@@ -2506,47 +2899,51 @@ async def retry_failed_uploads(espuino_ip: str | None = None):
 @app.get("/readers")
 async def list_readers():
     """List all readers (cached + connected)."""
-    result = []
+    keyed = []  # (sort key, reader entry)
 
     # Merge cached readers with connected readers
-    all_reader_ips = set(connected_readers.keys()) | set(
-        device_service.get_cached_readers().keys()
-    )
+    cached_readers = device_service.get_cached_readers()
+    all_reader_ips = connected_readers.keys() | cached_readers.keys()
 
     for ip in all_reader_ips:
         # Get data from connected (live) or cache
         if ip in connected_readers:
-            data = connected_readers[ip].copy()
+            live = connected_readers[ip]
+            data = _readable_times(live)
             data["online"] = True
+            # Live readers keep last_seen as an epoch float
+            sort_key = (False, live["last_seen"])
         else:
-            cached = device_service.get_cached_readers().get(ip, {})
-            data = cached.copy()
+            data = cached_readers[ip].copy()
             data["online"] = False
+            sort_key = (True, data.get("last_seen") or "")
 
         state = get_reader_state(ip)
-        current_tag = state.get("current_tag")
+        current_tag = state.current_tag
         # Use the actual playing device if there's an active stream, otherwise use default
-        playing_device = state.get("current_device") if current_tag else None
+        playing_device = state.current_device if current_tag else None
         default_device = device_service.get_device_for_reader(ip)
 
-        result.append(
-            {
-                "ip": ip,
-                **data,
-                "current_tag": current_tag,
-                "device": playing_device or default_device,  # Actual device being used
-                "default_device": default_device,  # Configured default
-                "device_override": device_service.get_reader_device_override(ip)
-                is not None,
-                "device_temp": ip in device_service.reader_current_devices,
-            }
+        keyed.append(
+            (
+                sort_key,
+                {
+                    "ip": ip,
+                    **data,
+                    "current_tag": current_tag,
+                    "device": playing_device
+                    or default_device,  # Actual device being used
+                    "default_device": default_device,  # Configured default
+                    "device_override": device_service.get_reader_device_override(ip)
+                    is not None,
+                    "device_temp": ip in device_service.reader_current_devices,
+                },
+            )
         )
 
     # Sort: online first, then by last_seen
-    result.sort(
-        key=lambda r: (not r.get("online", False), r.get("last_seen", "") or ""),
-        reverse=True,
-    )
+    keyed.sort(key=itemgetter(0), reverse=True)
+    result = [entry for _, entry in keyed]
 
     return {"count": len(result), "readers": result}
 
@@ -2576,14 +2973,17 @@ async def remove_reader(reader_ip: str):
 
 
 @app.get("/api/features")
-async def get_feature_flags():
+async def get_feature_flags(request: Request):
     """Get feature flags for the frontend.
 
     Used to conditionally show/hide features based on deployment configuration.
     """
-    return {
-        "espuino_enabled": ESPUINO_ENABLED,
-    }
+    return _etag_response(
+        request,
+        {
+            "espuino_enabled": ESPUINO_ENABLED,
+        },
+    )
 
 
 @app.get("/api/logs")
@@ -2598,23 +2998,23 @@ async def get_server_logs(
         limit: Maximum number of logs to return (default 100, max 500)
     """
     limit = min(limit, 500)
-    logs = list(log_capture.logs)
-
-    # Filter by level if specified
-    if level:
-        level_upper = level.upper()
-        logs = [log for log in logs if log["level"] == level_upper]
-
-    # Return most recent logs (reversed so newest first)
-    return {
-        "logs": list(reversed(logs[-limit:])),
-        "total": len(log_capture.logs),
-        "filtered": len(logs),
-    }
+    level = level.upper() if level else None
+
+    # Most recent logs first (per-level ring if filtered), spliced from the
+    # pre-encoded records instead of re-serializing them
+    body = b"".join(
+        (
+            b'{"logs":[',
+            b",".join(log_capture.latest(limit, level)),
+            b'],"total":%d,"filtered":%d}'
+            % (log_capture.count(), log_capture.count(level)),
+        )
+    )
+    return Response(content=body, media_type="application/json")
 
 
 @app.get("/api/devices")
-async def get_all_playback_devices():
+async def get_all_playback_devices(request: Request):
     """Get all known playback devices for ESPuino stream mode configuration.
 
     Returns a flat list of all devices (Sonos, Chromecast, AirPlay, ESPuino)
@@ -2648,7 +3048,7 @@ async def get_all_playback_devices():
                     }
                 )
 
-    return {"devices": devices}
+    return _etag_response(request, {"devices": devices})
 
 
 @app.post("/readers/{reader_ip}/heartbeat")
@@ -2658,7 +3058,7 @@ async def reader_heartbeat(reader_ip: str, req: Request):
     Called on boot and periodically to maintain visibility in the UI.
     Accepts optional JSON body with {"name": "device_name"} to update the reader name.
     """
-    now = datetime.now()
+    now = time.time()
 
     # Parse optional name from request body
     reader_name = None
@@ -2670,24 +3070,23 @@ async def reader_heartbeat(reader_ip: str, req: Request):
         logger.debug(f"Reader heartbeat: no body or invalid JSON: {e}")
         pass  # No body or invalid JSON is fine
 
-    if reader_ip not in connected_readers:
+    reader = connected_readers.get(reader_ip)
+    if reader is None:
         # Check cache for existing name
         cached = device_service.get_cached_readers().get(reader_ip, {})
-        connected_readers[reader_ip] = {
-            "first_seen": now.isoformat(),
-            "last_seen": now.isoformat(),
+        reader = connected_readers[reader_ip] = {
+            "first_seen": now,
+            "last_seen": now,
             "scan_count": cached.get("scan_count", 0),
             "name": reader_name or cached.get("name") or f"Reader ({reader_ip})",
         }
-        logger.info(
-            f"Reader heartbeat (new): {reader_ip} - {connected_readers[reader_ip]['name']}"
-        )
+        logger.info(f"Reader heartbeat (new): {reader_ip} - {reader['name']}")
     else:
-        connected_readers[reader_ip]["last_seen"] = now.isoformat()
+        reader["last_seen"] = now
         # Update name if provided
         if reader_name:
-            old_name = connected_readers[reader_ip].get("name", "unknown")
-            connected_readers[reader_ip]["name"] = reader_name
+            old_name = reader.get("name", "unknown")
+            reader["name"] = reader_name
             if old_name != reader_name:
                 logger.info(
                     f"Reader {reader_ip} name updated: '{old_name}' -> '{reader_name}'"
@@ -2695,12 +3094,7 @@ async def reader_heartbeat(reader_ip: str, req: Request):
 
     # Update persistent cache
     device_service.update_reader_cache(
-        reader_ip,
-        {
-            "name": connected_readers[reader_ip]["name"],
-            "last_seen": now.isoformat(),
-            "scan_count": connected_readers[reader_ip]["scan_count"],
-        },
+        reader_ip, {"name": reader["name"], "scan_count": reader["scan_count"]}
     )
 
     # Check for pending uploads and resume if ESPuino just came online
@@ -2710,7 +3104,7 @@ async def reader_heartbeat(reader_ip: str, req: Request):
         logger.info(
             f"ESPuino {reader_ip} online - checking pending upload: {pending.get('folder_path')}"
         )
-        asyncio.create_task(resume_pending_upload(reader_ip, pending))
+        _spawn(resume_pending_upload(reader_ip, pending))
 
     return {"status": "ok", "reader_ip": reader_ip}
 
@@ -2721,9 +3115,6 @@ async def resume_pending_upload(espuino_ip: str, pending: dict):
 
     Verifies what's on SD card and uploads only missing/corrupt files.
     """
-    import tempfile
-    import json
-
     folder_path = pending.get("folder_path")
     if not folder_path:
         logger.warning(f"No folder path in pending upload for {espuino_ip}")
@@ -2769,7 +3160,10 @@ async def resume_pending_upload(espuino_ip: str, pending: dict):
         f"Resuming upload to {espuino_ip}: {len(retry_indices)} tracks to upload"
     )
 
-    idle_kbps = int(os.getenv("ESPUINO_UPLOAD_MAX_KBPS_IDLE", "0"))
+    idle_kbps = device_service.ESPUINO_UPLOAD_MAX_KBPS_IDLE
+    # One cache dir scan instead of exists()/stat() per track and pass; the
+    # intent's source paths are the get_track_cache_path() files
+    track_sizes = await _stat_track_sizes(pending.get("audio_url", ""), len(tracks))
 
     # Upload missing/corrupt tracks
     title = pending.get("series", "") or pending.get("episode", "") or "Tonie"
@@ -2786,9 +3180,9 @@ async def resume_pending_upload(espuino_ip: str, pending: dict):
         track = tracks[i]
         source_path = Path(track.get("source_path", ""))
         dest_path = track.get("dest_path", "")
-        track_name = track.get("name", f"Track {i + 1}")
+        track_name = _track_name(track, i)
 
-        if source_path.exists():
+        if track_sizes[i]:
             logger.info(f"Uploading track {seq}/{len(retry_indices)}: {track_name}")
             result = await device_service.upload_to_espuino(
                 espuino_ip,
@@ -2813,29 +3207,19 @@ async def resume_pending_upload(espuino_ip: str, pending: dict):
         pending.get("episode", ""),
         tracks,
         pending.get("audio_url", ""),
+        sizes=track_sizes,
     )
-    # Add file sizes
-    for i, track in enumerate(tracks):
-        source_path = Path(track.get("source_path", ""))
-        if source_path.exists():
-            metadata["tracks"][i]["size"] = source_path.stat().st_size
 
     metadata_path = f"{folder_path}/metadata.json"
-    with tempfile.NamedTemporaryFile(mode="w", suffix=".json", delete=False) as f:
-        json.dump(metadata, f, indent=2)
-        temp_metadata = Path(f.name)
-    try:
-        await device_service.upload_to_espuino(
-            espuino_ip,
-            temp_metadata,
-            metadata_path,
-            title=f"{title} - metadata",
-            total_tracks=len(retry_indices),
-            max_kbps=idle_kbps,
-            is_aux=True,
-        )
-    finally:
-        temp_metadata.unlink(missing_ok=True)
+    await device_service.upload_to_espuino(
+        espuino_ip,
+        await asyncio.to_thread(_json_bytes, metadata),
+        metadata_path,
+        title=f"{title} - metadata",
+        total_tracks=len(retry_indices),
+        max_kbps=idle_kbps,
+        is_aux=True,
+    )
 
     # Upload UID mapping for local cache lookup
     uid_map_path = build_espuino_uid_map_path(pending.get("uid", ""))
@@ -2845,32 +3229,18 @@ async def resume_pending_upload(espuino_ip: str, pending: dict):
         "title": pending.get("series", "") or pending.get("episode", "") or "Tonie",
         "series": pending.get("series", ""),
         "episode": pending.get("episode", ""),
-        "files": [
-            {
-                "index": i,
-                "name": Path(t.get("dest_path", "")).name,
-                "size": Path(t.get("source_path", "")).stat().st_size
-                if Path(t.get("source_path", "")).exists()
-                else 0,
-            }
-            for i, t in enumerate(tracks)
-        ],
+        "files": _build_uid_map_files(
+            [t.get("dest_path", "") for t in tracks], track_sizes
+        ),
     }
-    with tempfile.NamedTemporaryFile(mode="w", suffix=".json", delete=False) as f:
-        json.dump(uid_map, f, indent=2)
-        temp_uid_map = Path(f.name)
-    try:
-        await device_service.upload_to_espuino(
-            espuino_ip,
-            temp_uid_map,
-            uid_map_path,
-            title=f"{title} - uid-map",
-            total_tracks=len(retry_indices),
-            max_kbps=idle_kbps,
-            is_aux=True,
-        )
-    finally:
-        temp_uid_map.unlink(missing_ok=True)
+    await _upload_uid_map(
+        espuino_ip,
+        uid_map,
+        uid_map_path,
+        title,
+        total_tracks=len(retry_indices),
+        max_kbps=idle_kbps,
+    )
 
     # Verify again
     verification = await device_service.verify_espuino_upload(
@@ -2881,16 +3251,11 @@ async def resume_pending_upload(espuino_ip: str, pending: dict):
     if verification.get("complete"):
         logger.info(f"Resume upload complete for {espuino_ip}")
         # Auto-link RFID to local folder after verification
-        folder_for_link = verification.get("folder") or folder_path
-        tag_id = uid_to_espuino_tag_id(pending.get("uid", ""))
-        if tag_id:
-            if await device_service.set_espuino_rfid_mapping(
-                espuino_ip, tag_id, folder_for_link, play_mode=5
-            ):
-                logger.info(f"RFID mapping updated for {tag_id} -> {folder_for_link}")
-            else:
-                logger.warning(f"Failed to update RFID mapping for {tag_id}")
-        device_service.clear_pending_upload(espuino_ip)
+        await _link_rfid_and_clear_pending(
+            espuino_ip,
+            uid_to_espuino_tag_id(pending.get("uid", "")),
+            verification.get("folder") or folder_path,
+        )
     else:
         logger.warning(f"Resume upload incomplete for {espuino_ip}: {verification}")
 
@@ -2898,7 +3263,7 @@ async def resume_pending_upload(espuino_ip: str, pending: dict):
 @app.get("/scans")
 async def list_scans(limit: int = 20):
     """Get recent tag scans from all readers."""
-    scans = list(recent_scans)[:limit]
+    scans = _latest_scans(limit)
     return {"count": len(scans), "scans": scans}
 
 
@@ -3061,7 +3426,7 @@ async def prefetch_cache(request: PrefetchRequest):
         except Exception as e:
             logger.error(f"Prefetch encoding failed: {e}")
 
-    asyncio.create_task(encode_prefetch())
+    _spawn_encode(encode_prefetch(), audio_url)
 
     return {"status": "encoding", "audio_url": audio_url, "tracks": len(tracks)}
 
@@ -3156,10 +3521,10 @@ async def play_tonie(request: PlayTonieRequest):
 async def update_reader_position(reader_ip: str, update: PositionUpdate):
     """Update playback position for browser-based playback."""
     state = get_reader_state(reader_ip)
-    current = state.get("current_tag")
+    current = state.current_tag
     if not current or current.get("uid") != update.uid:
         return {"status": "ignored"}
-    state["last_reported_position"] = max(0.0, float(update.position))
+    state.last_reported_position = max(0.0, float(update.position))
     return {"status": "ok"}
 
 
@@ -3176,7 +3541,7 @@ async def play_url(request: PlayUrlRequest, req: Request):
     device_type = active_device.get("type", "")
     settings = get_settings()
 
-    if device_type in ["sonos", "airplay", "chromecast", "browser", "espuino"]:
+    if device_type == "browser" or device_type in TRANSCODE_TYPES:
         # Use MP3 for seekable playback (cached files, ~40s encoding)
         if settings.server_url:
             server_base = settings.server_url.rstrip("/")
@@ -3187,7 +3552,7 @@ async def play_url(request: PlayUrlRequest, req: Request):
 
         # For network devices, encoding happens when /transcode.mp3 is requested
         # Don't pre-set encoding status - let transcode endpoint handle it
-        if device_type in ["sonos", "airplay", "chromecast", "espuino"]:
+        if device_type in TRANSCODE_TYPES:
             cache_dir = get_tonie_cache_dir(request.audio_url)
             metadata_path = cache_dir / "metadata.json"
             if metadata_path.exists():
@@ -3228,7 +3593,7 @@ async def play_url(request: PlayUrlRequest, req: Request):
                     except Exception as e:
                         logger.error(f"Background MP3 encoding failed: {e}")
 
-                asyncio.create_task(encode_for_browser())
+                _spawn(encode_for_browser())
     else:
         playback_url = request.audio_url
 
@@ -3239,21 +3604,24 @@ async def play_url(request: PlayUrlRequest, req: Request):
         f"web-{active_device.get('type', 'browser')}-{active_device.get('id', 'web')}"
     )
     state = get_reader_state(reader_ip)
-    state["current_tag"] = {
-        "uid": f"url:{hash(request.audio_url) % 10000000}",  # Synthetic UID for URL
-        "series": None,
-        "episode": None,
-        "title": request.title,
-        "picture": None,
-        "audio_url": request.audio_url,
-        "playback_url": playback_url,
-        "placed_at": datetime.now().isoformat(),
-        "start_position": 0,
-    }
-    state["current_started_at"] = time.time()
-    state["current_offset"] = 0.0
-    state["current_device"] = active_device
-    state["last_reported_position"] = 0.0
+    set_current_tag(
+        state,
+        {
+            "uid": f"url:{hash(request.audio_url) % 10000000}",  # Synthetic UID for URL
+            "series": None,
+            "episode": None,
+            "title": request.title,
+            "picture": None,
+            "audio_url": request.audio_url,
+            "playback_url": playback_url,
+            "placed_at": _now_iso_cached(),
+            "start_position": 0,
+        },
+    )
+    state.current_started_at = time.time()
+    state.current_offset = 0.0
+    state.current_device = active_device
+    state.last_reported_position = 0.0
 
     # For non-browser devices, actually start playback
     if device_type != "browser":
@@ -3681,16 +4049,16 @@ async def set_reader_current_device(reader_ip: str, request: DeviceDefaultReques
 
     # If a tag is currently playing, restart playback on new device
     state = get_reader_state(reader_ip)
-    current = state.get("current_tag")
+    current = state.current_tag
     if current and current.get("uid"):
         logger.info(f"Switching playback to new device for {reader_ip}")
         # Stop current playback
-        old_device = state.get("current_device")
+        old_device = state.current_device
         if old_device:
             await device_service.stop_device(old_device)
 
         # Update current device
-        state["current_device"] = device
+        state.current_device = device
 
         # Rebuild playback URL for new device (browser uses original, others need transcode)
         audio_url = current.get("audio_url")
@@ -3700,7 +4068,7 @@ async def set_reader_current_device(reader_ip: str, request: DeviceDefaultReques
             current["playback_url"] = playback_url
 
             # Pre-encode for network devices (they timeout waiting for encoding)
-            if request.type in ["sonos", "airplay", "chromecast"]:
+            if request.type in NETWORK_PLAYER_TYPES:
                 logger.info(f"Pre-encoding MP3 for device switch to {request.type}...")
                 try:
                     cover_url = (
@@ -3760,11 +4128,9 @@ async def reader_playback_play(reader_ip: str):
     """Resume playback for a reader."""
     state = get_reader_state(reader_ip)
     # Use the actual playing device, not the default
-    device = state.get("current_device") or device_service.get_device_for_reader(
-        reader_ip
-    )
-    current = state.get("current_tag")
-    resume = state.get("resume") or {}
+    device = state.current_device or device_service.get_device_for_reader(reader_ip)
+    current = state.current_tag
+    resume = state.resume or {}
     resume_device = resume.get("device")
     same_device = bool(
         resume_device
@@ -3792,10 +4158,10 @@ async def reader_playback_play(reader_ip: str):
                 start_position=start_position,
             )
         if success:
-            state["current_started_at"] = time.time()
-            state["current_offset"] = float(resume.get("position", 0.0))
-            state["last_reported_position"] = float(resume.get("position", 0.0))
-            state["resume"] = None
+            state.current_started_at = time.time()
+            state.current_offset = float(resume.get("position", 0.0))
+            state.last_reported_position = float(resume.get("position", 0.0))
+            state.resume = None
     else:
         success = await device_service.resume_device(device)
 
@@ -3811,21 +4177,19 @@ async def reader_playback_pause(reader_ip: str):
     """Pause playback for a reader."""
     state = get_reader_state(reader_ip)
     # Use the actual playing device, not the default
-    device = state.get("current_device") or device_service.get_device_for_reader(
-        reader_ip
-    )
-    current = state.get("current_tag")
+    device = state.current_device or device_service.get_device_for_reader(reader_ip)
+    current = state.current_tag
     if current:
         position = await get_resume_position(reader_ip, device)
-        state["resume"] = {
+        state.resume = {
             "uid": current.get("uid", ""),
             "position": position,
             "device": device,
             "paused": True,
         }
-        state["current_offset"] = position
-        state["current_started_at"] = None
-        state["last_reported_position"] = position
+        state.current_offset = position
+        state.current_started_at = None
+        state.last_reported_position = position
     success = await device_service.pause_device(device)
     return {
         "status": "ok" if success else "error",
@@ -3849,9 +4213,7 @@ class SeekRequest(BaseModel):
 async def reader_playback_seek(reader_ip: str, request: SeekRequest):
     """Seek to a position in the current playback for a reader."""
     state = get_reader_state(reader_ip)
-    device = state.get("current_device") or device_service.get_device_for_reader(
-        reader_ip
-    )
+    device = state.current_device or device_service.get_device_for_reader(reader_ip)
 
     if device.get("type") == "browser":
         # Browser seek is handled client-side
@@ -3864,9 +4226,9 @@ async def reader_playback_seek(reader_ip: str, request: SeekRequest):
 
     success = await device_service.seek_device(device, request.position)
     if success:
-        state["current_offset"] = request.position
-        state["current_started_at"] = time.time()
-        state["last_reported_position"] = request.position
+        state.current_offset = request.position
+        state.current_started_at = time.time()
+        state.last_reported_position = request.position
 
     return {
         "status": "ok" if success else "error",
@@ -3879,9 +4241,7 @@ async def reader_playback_seek(reader_ip: str, request: SeekRequest):
 @app.post("/readers/{reader_ip}/playback/next")
 async def reader_playback_next(reader_ip: str):
     state = get_reader_state(reader_ip)
-    device = state.get("current_device") or device_service.get_device_for_reader(
-        reader_ip
-    )
+    device = state.current_device or device_service.get_device_for_reader(reader_ip)
 
     if not device or device.get("type") == "browser":
         return {"status": "error", "error": "Next track not supported for browser"}
@@ -3905,9 +4265,7 @@ async def reader_playback_next(reader_ip: str):
 @app.post("/readers/{reader_ip}/playback/prev")
 async def reader_playback_prev(reader_ip: str):
     state = get_reader_state(reader_ip)
-    device = state.get("current_device") or device_service.get_device_for_reader(
-        reader_ip
-    )
+    device = state.current_device or device_service.get_device_for_reader(reader_ip)
 
     if not device or device.get("type") == "browser":
         return {"status": "error", "error": "Prev track not supported for browser"}
@@ -3947,13 +4305,13 @@ async def handle_control_command(request: ControlRequest):
     state = get_reader_state(reader_ip)
 
     # Check if this reader has an active stream
-    current_tag = state.get("current_tag")
+    current_tag = state.current_tag
     if not current_tag:
         logger.warning(f"Control command from {reader_ip} but no active stream")
         return {"status": "error", "error": "No active stream"}
 
     # Get the target device (either from stream mode or default)
-    device = state.get("target_device") or state.get("current_device")
+    device = state.target_device or state.current_device
     if not device:
         device = device_service.get_device_for_reader(reader_ip)
 
@@ -3980,27 +4338,27 @@ async def handle_control_command(request: ControlRequest):
     elif action == "stop":
         success = await device_service.stop_device(device)
         # Also clear the stream state
-        state["current_tag"] = None
-        state["mode"] = "local"
-        state["target_device"] = None
+        set_current_tag(state, None)
+        state.mode = "local"
+        state.target_device = None
     elif action == "skip":
         # Skip forward 60 seconds
-        current_pos = state.get("last_reported_position", 0)
+        current_pos = state.last_reported_position
         duration = current_tag.get("duration", 0)
         if duration > 0:
             new_pos = min(current_pos + 60, duration - 1)  # Skip 60 seconds forward
             success = await device_service.seek_device(device, new_pos)
             if success:
-                state["last_reported_position"] = new_pos
+                state.last_reported_position = new_pos
         else:
             success = False
     elif action == "prev":
         # Skip back 60 seconds (minimum 0)
-        current_pos = state.get("last_reported_position", 0)
+        current_pos = state.last_reported_position
         new_pos = max(current_pos - 60, 0)  # Skip 60 seconds back
         success = await device_service.seek_device(device, new_pos)
         if success:
-            state["last_reported_position"] = new_pos
+            state.last_reported_position = new_pos
     elif action in ("volume_up", "volume_down"):
         # Volume control - not all devices support this
         logger.info(f"Volume control not implemented for {device['type']}")
@@ -4214,6 +4572,7 @@ async def delete_tonie_cache(uid: str):
 
     # Delete cache directory
     shutil.rmtree(cache_dir)
+    forget_fully_encoded(audio_url)
     logger.info(f"Deleted cache for {uid}: {cache_dir}")
 
     return {
@@ -4237,7 +4596,6 @@ async def reupload_to_espuino(uid: str, request: ReuploadRequest):
     UID format: "E0:04:03:50:13:16:80:4B" or URL-encoded
     """
     import json
-    import tempfile
     from urllib.parse import unquote
 
     uid = unquote(uid)
@@ -4290,7 +4648,7 @@ async def reupload_to_espuino(uid: str, request: ReuploadRequest):
     # Upload each track
     uploaded = 0
     for i, track in enumerate(tracks):
-        track_path = cache_dir / f"{i + 1:02d}.mp3"
+        track_path = get_track_cache_path(audio_url, i)
         if track_path.exists():
             dest_path = (
                 f"{dest_folder}/{i + 1:02d}_{track.get('name', f'Track_{i + 1}')}.mp3"
@@ -4311,27 +4669,12 @@ async def reupload_to_espuino(uid: str, request: ReuploadRequest):
 
     # Upload UID mapping
     uid_map_path = f"/teddycloud/uids/{uid_clean}.json"
-    temp_uid_map = Path(tempfile.gettempdir()) / f"uid_map_{uid_clean}.json"
     uid_map_content = {"uid": uid, "path": f"/{dest_folder}"}
-
-    try:
-        with open(temp_uid_map, "w") as f:
-            json.dump(uid_map_content, f)
-
-        map_result = await device_service.upload_to_espuino(
-            espuino_ip,
-            temp_uid_map,
-            uid_map_path,
-            title=f"{title} - uid-map",
-            total_tracks=1,
-            is_aux=True,
-        )
-        if map_result.get("success"):
-            logger.info(f"Uploaded UID map: {uid_map_path}")
-        else:
-            logger.warning(f"UID map upload failed: {map_result.get('error')}")
-    finally:
-        temp_uid_map.unlink(missing_ok=True)
+    map_result = await _upload_uid_map(espuino_ip, uid_map_content, uid_map_path, title)
+    if map_result.get("success"):
+        logger.info(f"Uploaded UID map: {uid_map_path}")
+    else:
+        logger.warning(f"UID map upload failed: {map_result.get('error')}")
 
     return {
         "status": "ok",
@@ -4390,7 +4733,7 @@ async def serve_spa(full_path: str):
     """Serve Svelte SPA - all non-API routes return index.html"""
     # Check if it's a static asset request that wasn't caught
     file_path = STATIC_DIR / full_path
-    if file_path.exists() and file_path.is_file():
+    if file_path.is_file():
         return FileResponse(file_path)
 
     # Otherwise return index.html for client-side routing
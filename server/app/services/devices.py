@@ -3,14 +3,17 @@
 from __future__ import annotations
 
 import asyncio
-import io
 import json
 import logging
 import os
+import tempfile
 import time
+from collections import deque
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Awaitable, Callable, Dict, List
+
+from aiohttp.payload import Payload
 
 logger = logging.getLogger(__name__)
 
@@ -136,6 +139,59 @@ def get_all_pending_uploads() -> dict:
 _load_upload_queue()
 
 
+# SD upload jobs per ESPuino: run one at a time, coalescing repeats of a key
+# (tonie UID) that is already queued or running
+_sd_upload_jobs: dict[str, deque[tuple[str, Callable[[], Awaitable[None]]]]] = {}
+_sd_upload_running: dict[str, str] = {}
+_sd_upload_workers: dict[str, asyncio.Task] = {}
+
+
+def enqueue_sd_upload(
+    espuino_ip: str, key: str, job: Callable[[], Awaitable[None]]
+) -> bool:
+    """Queue an SD upload job for an ESPuino.
+
+    Returns False if a job with the same key is already queued or running.
+    """
+    jobs = _sd_upload_jobs.setdefault(espuino_ip, deque())
+    if _sd_upload_running.get(espuino_ip) == key or any(k == key for k, _ in jobs):
+        logger.info(f"SD upload for {key} already pending on {espuino_ip}, skipping")
+        return False
+    jobs.append((key, job))
+    if espuino_ip not in _sd_upload_workers:
+        _sd_upload_workers[espuino_ip] = asyncio.create_task(
+            _run_sd_uploads(espuino_ip)
+        )
+    return True
+
+
+async def _run_sd_uploads(espuino_ip: str) -> None:
+    """Drain the SD upload jobs for one ESPuino, then exit."""
+    jobs = _sd_upload_jobs[espuino_ip]
+    try:
+        while jobs:
+            key, job = jobs.popleft()
+            _sd_upload_running[espuino_ip] = key
+            try:
+                await job()
+            except Exception as e:
+                logger.error(f"SD upload job {key} failed on {espuino_ip}: {e}")
+            finally:
+                _sd_upload_running.pop(espuino_ip, None)
+    finally:
+        _sd_upload_workers.pop(espuino_ip, None)
+
+
+async def cancel_sd_uploads() -> None:
+    """Drop queued SD upload jobs and cancel the running workers (shutdown)."""
+    for jobs in _sd_upload_jobs.values():
+        jobs.clear()
+    workers = list(_sd_upload_workers.values())
+    for task in workers:
+        task.cancel()
+    await asyncio.gather(*workers, return_exceptions=True)
+
+
 def get_upload_status(
     espuino_ip: str, dest_path: str | None = None
 ) -> dict | list[dict]:
@@ -358,6 +414,11 @@ def init_device_cache():
 # Reader cache functions
 _reader_cache: dict[str, dict] = {}
 
+# Reader updates arrive on every tag scan; writes are coalesced and flushed
+# by reader_cache_flush_loop() at most once per interval.
+READER_CACHE_FLUSH_INTERVAL = 2.0
+_reader_cache_dirty = False
+
 
 def _load_reader_cache() -> dict[str, dict]:
     """Load reader cache from file."""
@@ -372,12 +433,19 @@ def _load_reader_cache() -> dict[str, dict]:
     return {}
 
 
-def _save_reader_cache() -> bool:
-    """Save reader cache to file."""
+def _save_reader_cache(cache: dict[str, dict] | None = None) -> bool:
+    """Save reader cache (or a snapshot of it) to file.
+
+    Writes a private temp file and swaps it in, so a save still running in
+    the flush loop's worker thread can never leave a truncated file behind.
+    """
     try:
         CONFIG_DIR.mkdir(parents=True, exist_ok=True)
-        with open(READER_CACHE_FILE, "w") as f:
-            json.dump(_reader_cache, f, indent=2)
+        with tempfile.NamedTemporaryFile(
+            "w", dir=CONFIG_DIR, prefix=".reader_cache.", delete=False
+        ) as f:
+            json.dump(_reader_cache if cache is None else cache, f, indent=2)
+        os.replace(f.name, READER_CACHE_FILE)
         return True
     except IOError as e:
         logger.error(f"Failed to save reader cache: {e}")
@@ -400,7 +468,8 @@ def get_cached_readers() -> dict[str, dict]:
 
 
 def update_reader_cache(ip: str, data: dict) -> dict:
-    """Update or add a reader to the cache."""
+    """Update or add a reader to the cache (persisted by the flush loop)."""
+    global _reader_cache_dirty
     now = datetime.now().isoformat()
     if ip in _reader_cache:
         # Update existing
@@ -415,24 +484,55 @@ def update_reader_cache(ip: str, data: dict) -> dict:
             "last_seen": now,
             "online": True,
         }
-    _save_reader_cache()
+    # Written to file by the next flush_reader_cache()
+    _reader_cache_dirty = True
     return _reader_cache[ip]
 
 
+def flush_reader_cache() -> bool:
+    """Persist the reader cache if it changed since the last flush."""
+    global _reader_cache_dirty
+    if not _reader_cache_dirty:
+        return True
+    if _save_reader_cache():
+        _reader_cache_dirty = False
+        return True
+    return False
+
+
+async def reader_cache_flush_loop(interval: float = READER_CACHE_FLUSH_INTERVAL):
+    """Background task that periodically flushes dirty reader updates to disk.
+
+    A snapshot is written from a worker thread, so scans keep updating the
+    live cache while the file is being saved.
+    """
+    global _reader_cache_dirty
+    while True:
+        await asyncio.sleep(interval)
+        if not _reader_cache_dirty:
+            continue
+        snapshot = {ip: dict(info) for ip, info in _reader_cache.items()}
+        _reader_cache_dirty = False
+        if not await asyncio.to_thread(_save_reader_cache, snapshot):
+            _reader_cache_dirty = True
+
+
 def rename_reader(ip: str, name: str) -> bool:
-    """Rename a reader."""
+    """Rename a reader (persisted by the flush loop)."""
+    global _reader_cache_dirty
     if ip in _reader_cache:
         _reader_cache[ip]["name"] = name
-        _save_reader_cache()
+        _reader_cache_dirty = True
         return True
     return False
 
 
 def remove_reader(ip: str) -> bool:
-    """Remove a reader from the cache."""
+    """Remove a reader from the cache (persisted by the flush loop)."""
+    global _reader_cache_dirty
     if ip in _reader_cache:
         del _reader_cache[ip]
-        _save_reader_cache()
+        _reader_cache_dirty = True
         return True
     return False
 
@@ -1775,9 +1875,47 @@ async def resume_chromecast(device_id: str) -> bool:
         return False
 
 
+# Shared keep-alive session for all ESPuino HTTP calls (closed in lifespan).
+# Per-request timeouts override the session default.
+_espuino_session: Any = None
+
+
+def get_espuino_session() -> aiohttp.ClientSession:
+    """Get the shared ESPuino session, creating it on first use."""
+    global _espuino_session
+    import aiohttp
+
+    if _espuino_session is None or _espuino_session.closed:
+        _espuino_session = aiohttp.ClientSession(
+            timeout=aiohttp.ClientTimeout(total=5),
+            connector=aiohttp.TCPConnector(
+                limit_per_host=4,
+                keepalive_timeout=60,
+                ttl_dns_cache=300,
+                enable_cleanup_closed=True,
+            ),
+            # Small LAN requests: skip headers ESPuino ignores, small read buffer
+            skip_auto_headers=("User-Agent", "Accept-Encoding"),
+            read_bufsize=4096,
+        )
+    return _espuino_session
+
+
+async def close_espuino_session() -> None:
+    """Close the shared ESPuino session."""
+    global _espuino_session
+    if _espuino_session is not None and not _espuino_session.closed:
+        await _espuino_session.close()
+    _espuino_session = None
+
+
 # ESPuino playback functions
 async def play_on_espuino(
-    ip: str, audio_url: str, title: str = "Tonie", start_position: float | None = None
+    ip: str,
+    audio_url: str,
+    title: str = "Tonie",
+    start_position: float | None = None,
+    session: aiohttp.ClientSession | None = None,
 ) -> bool:
     """Play audio URL on an ESPuino device.
 
@@ -1796,17 +1934,17 @@ async def play_on_espuino(
         logger.info(f"Playing on ESPuino {ip}: {title}")
         logger.debug(f"ESPuino URL: {espuino_url}")
 
-        async with aiohttp.ClientSession() as session:
-            async with session.post(
-                espuino_url, timeout=aiohttp.ClientTimeout(total=10)
-            ) as resp:
-                if resp.status == 200:
-                    logger.info(f"ESPuino {ip} playback started: {title}")
-                    return True
-                else:
-                    text = await resp.text()
-                    logger.error(f"ESPuino {ip} returned {resp.status}: {text}")
-                    return False
+        session = session or get_espuino_session()
+        async with session.post(
+            espuino_url, timeout=aiohttp.ClientTimeout(total=10)
+        ) as resp:
+            if resp.status == 200:
+                logger.info(f"ESPuino {ip} playback started: {title}")
+                return True
+            else:
+                text = await resp.text()
+                logger.error(f"ESPuino {ip} returned {resp.status}: {text}")
+                return False
     except asyncio.TimeoutError:
         logger.error(f"ESPuino {ip} connection timeout")
         return False
@@ -1815,7 +1953,12 @@ async def play_on_espuino(
         return False
 
 
-async def play_espuino_from_sd(ip: str, folder_path: str, title: str = "Tonie") -> bool:
+async def play_espuino_from_sd(
+    ip: str,
+    folder_path: str,
+    title: str = "Tonie",
+    session: aiohttp.ClientSession | None = None,
+) -> bool:
     """Play audio from local SD card folder on ESPuino.
 
     For multi-track Tonies stored on SD card. ESPuino will play all MP3s in folder.
@@ -1835,19 +1978,17 @@ async def play_espuino_from_sd(ip: str, folder_path: str, title: str = "Tonie")
         logger.info(f"Playing from SD on ESPuino {ip}: {sd_path}")
         logger.debug(f"ESPuino SD URL: {espuino_url}")
 
-        async with aiohttp.ClientSession() as session:
-            async with session.post(
-                espuino_url, timeout=aiohttp.ClientTimeout(total=10)
-            ) as resp:
-                if resp.status == 200:
-                    logger.info(f"ESPuino {ip} SD playback started: {title}")
-                    return True
-                else:
-                    text = await resp.text()
-                    logger.error(
-                        f"ESPuino {ip} SD playback failed {resp.status}: {text}"
-                    )
-                    return False
+        session = session or get_espuino_session()
+        async with session.post(
+            espuino_url, timeout=aiohttp.ClientTimeout(total=10)
+        ) as resp:
+            if resp.status == 200:
+                logger.info(f"ESPuino {ip} SD playback started: {title}")
+                return True
+            else:
+                text = await resp.text()
+                logger.error(f"ESPuino {ip} SD playback failed {resp.status}: {text}")
+                return False
     except asyncio.TimeoutError:
         logger.error(f"ESPuino {ip} connection timeout")
         return False
@@ -1856,8 +1997,52 @@ async def play_espuino_from_sd(ip: str, folder_path: str, title: str = "Tonie")
         return False
 
 
+# Recent ESPuino directory listings: (ip, folder) -> (expires_at, {name: size})
+# Lets existence/size probes skip the /explorer round trip for a short while.
+ESPUINO_LISTING_TTL = 30
+_espuino_listing_cache: dict[tuple[str, str], tuple[float, dict[str, int]]] = {}
+
+
+def _espuino_parent_dir(file_path: str) -> str:
+    parent_dir = str(Path(file_path).parent)
+    return "/" if parent_dir == "." else parent_dir
+
+
+def _remember_espuino_listing(ip: str, folder_path: str, files: list[dict]) -> None:
+    """Cache the name -> size map of a freshly fetched directory listing."""
+    _espuino_listing_cache[(ip, folder_path)] = (
+        time.monotonic() + ESPUINO_LISTING_TTL,
+        {f.get("name"): f.get("size", 0) for f in files},
+    )
+
+
+def _cached_espuino_listing(ip: str, folder_path: str) -> dict[str, int] | None:
+    entry = _espuino_listing_cache.get((ip, folder_path))
+    if entry is None:
+        return None
+    if entry[0] < time.monotonic():
+        del _espuino_listing_cache[(ip, folder_path)]
+        return None
+    return entry[1]
+
+
+def _note_espuino_file(ip: str, file_path: str, size: int | None) -> None:
+    """Keep a cached listing in step with an upload (size) or delete (None)."""
+    listing = _cached_espuino_listing(ip, _espuino_parent_dir(file_path))
+    if listing is None:
+        return
+    name = Path(file_path).name
+    if size is None:
+        listing.pop(name, None)
+    else:
+        listing[name] = size
+
+
 async def check_espuino_sd_ready(
-    ip: str, folder_path: str, expected_tracks: int = 0
+    ip: str,
+    folder_path: str,
+    expected_tracks: int = 0,
+    session: aiohttp.ClientSession | None = None,
 ) -> dict:
     """
     Check if a Tonie folder on ESPuino SD is ready for local playback.
@@ -1889,33 +2074,34 @@ async def check_espuino_sd_ready(
     try:
         url = f"http://{ip}/explorer?path={quote(folder_path, safe='')}"
 
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, timeout=aiohttp.ClientTimeout(total=5)) as resp:
-                if resp.status != 200:
-                    return result
+        session = session or get_espuino_session()
+        async with session.get(url, timeout=aiohttp.ClientTimeout(total=5)) as resp:
+            if resp.status != 200:
+                return result
 
-                # ESPuino sometimes returns garbage after JSON - extract valid JSON
-                try:
-                    raw_text = await resp.text()
-                    bracket_count = 0
-                    json_end = 0
-                    for i, char in enumerate(raw_text):
-                        if char == "[":
-                            bracket_count += 1
-                        elif char == "]":
-                            bracket_count -= 1
-                            if bracket_count == 0:
-                                json_end = i + 1
-                                break
-                    if json_end > 0:
-                        files = json_lib.loads(raw_text[:json_end])
-                    else:
-                        files = json_lib.loads(raw_text)
-                except (json_lib.JSONDecodeError, ValueError):
-                    # Can't parse - assume not ready, will stream instead
-                    return result
+            # ESPuino sometimes returns garbage after JSON - extract valid JSON
+            try:
+                raw_text = await resp.text()
+                bracket_count = 0
+                json_end = 0
+                for i, char in enumerate(raw_text):
+                    if char == "[":
+                        bracket_count += 1
+                    elif char == "]":
+                        bracket_count -= 1
+                        if bracket_count == 0:
+                            json_end = i + 1
+                            break
+                if json_end > 0:
+                    files = json_lib.loads(raw_text[:json_end])
+                else:
+                    files = json_lib.loads(raw_text)
+            except (json_lib.JSONDecodeError, ValueError):
+                # Can't parse - assume not ready, will stream instead
+                return result
 
         result["folder_exists"] = True
+        _remember_espuino_listing(ip, folder_path, files)
 
         # Count MP3 files
         mp3_count = sum(1 for f in files if f.get("name", "").lower().endswith(".mp3"))
@@ -1937,9 +2123,8 @@ async def check_espuino_sd_ready(
         return result
 
 
-async def stop_espuino(ip: str) -> bool:
+async def stop_espuino(ip: str, session: aiohttp.ClientSession | None = None) -> bool:
     """Stop playback on an ESPuino device via WebSocket command."""
-    import aiohttp
     import json
 
     logger.info(f"Attempting to stop ESPuino at {ip}")
@@ -1951,17 +2136,17 @@ async def stop_espuino(ip: str) -> bool:
         stop_cmd = json.dumps({"controls": {"action": 182}})
 
         logger.debug(f"Connecting to WebSocket: {ws_url}")
-        async with aiohttp.ClientSession() as session:
-            async with session.ws_connect(ws_url, timeout=5) as ws:
-                await ws.send_str(stop_cmd)
-                logger.info(f"Sent stop command to ESPuino {ip}: {stop_cmd}")
-                return True
+        session = session or get_espuino_session()
+        async with session.ws_connect(ws_url, timeout=5) as ws:
+            await ws.send_str(stop_cmd)
+            logger.info(f"Sent stop command to ESPuino {ip}: {stop_cmd}")
+            return True
     except Exception as e:
         logger.error(f"Failed to stop ESPuino {ip}: {e}")
         return False
 
 
-async def pause_espuino(ip: str) -> bool:
+async def pause_espuino(ip: str, session: aiohttp.ClientSession | None = None) -> bool:
     """Pause playback on an ESPuino device."""
     import aiohttp
 
@@ -1969,71 +2154,120 @@ async def pause_espuino(ip: str) -> bool:
         # ESPuino pause/play toggle
         url = f"http://{ip}/cmd?cmd=pauseplay"
 
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, timeout=aiohttp.ClientTimeout(total=5)) as resp:
-                if resp.status == 200:
-                    logger.info(f"Toggled pause on ESPuino {ip}")
-                    return True
-                return False
+        session = session or get_espuino_session()
+        async with session.get(url, timeout=aiohttp.ClientTimeout(total=5)) as resp:
+            if resp.status == 200:
+                logger.info(f"Toggled pause on ESPuino {ip}")
+                return True
+            return False
     except Exception as e:
         logger.error(f"Failed to pause ESPuino {ip}: {e}")
         return False
 
 
-async def resume_espuino(ip: str) -> bool:
+async def resume_espuino(ip: str, session: aiohttp.ClientSession | None = None) -> bool:
     """Resume playback on an ESPuino device (same as pause - toggle)."""
-    return await pause_espuino(ip)
+    return await pause_espuino(ip, session=session)
+
+
+class UploadRateLimiter:
+    """Token bucket shared by concurrent uploads (rate in bytes/sec).
 
+    Lets several uploads to one ESPuino stay in flight while their combined
+    bandwidth still honours a single max_kbps budget.
+    """
+
+    def __init__(self, bytes_per_sec: int):
+        self.rate = bytes_per_sec
+        self.capacity = bytes_per_sec  # allow up to one second of burst
+        self._tokens = float(bytes_per_sec)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def consume(self, amount: int) -> None:
+        """Take `amount` bytes from the bucket, sleeping off any deficit."""
+        if self.rate <= 0:
+            return
+        async with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.capacity, self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+            self._tokens -= amount
+            if self._tokens < 0:
+                await asyncio.sleep(-self._tokens / self.rate)
 
-class ProgressFileReader(io.BufferedReader):
-    """Buffered reader that tracks read progress for upload monitoring."""
+
+# One bandwidth budget per (ESPuino, rate), shared by every upload to that
+# device at that rate. Keying by rate keeps an idle-rate resume from
+# re-rating the bucket an active-playback upload is draining.
+_espuino_rate_limiters: dict[tuple[str, int], UploadRateLimiter] = {}
+
+
+def get_upload_rate_limiter(ip: str, bytes_per_sec: int) -> UploadRateLimiter | None:
+    """Return the shared limiter for an ESPuino at bytes_per_sec.
+
+    Returns None when bytes_per_sec <= 0 (unthrottled).
+    """
+    if bytes_per_sec <= 0:
+        return None
+    key = (ip, bytes_per_sec)
+    limiter = _espuino_rate_limiters.get(key)
+    if limiter is None:
+        limiter = _espuino_rate_limiters[key] = UploadRateLimiter(bytes_per_sec)
+    return limiter
+
+
+class ThrottledFilePayload(Payload):
+    """Multipart file part that streams from disk with an async rate limit.
+
+    The size is known up front, so ESPuino gets a Content-Length instead of
+    chunked transfer. Throttling sleeps on the event loop rather than
+    parking an executor thread for the whole upload.
+    """
 
     def __init__(
         self,
         file_path: Path,
+        size: int,
         callback,
-        max_bytes_per_sec: int = 0,
         chunk_size: int = 64 * 1024,
+        rate_limiter: UploadRateLimiter | None = None,
+        **kwargs,
     ):
-        raw = open(file_path, "rb")
-        super().__init__(raw)
-        self.total_size = file_path.stat().st_size
-        self.bytes_read = 0
+        super().__init__(file_path, **kwargs)
+        self._size = size
         self.callback = callback
-        self.last_callback_time = 0.0
-        self.max_bytes_per_sec = max_bytes_per_sec
         self.chunk_size = chunk_size
-        self.start_time = time.time()
-
-    def read(self, size: int = -1) -> bytes:
-        if size is None or size < 0 or size > self.chunk_size:
-            size = self.chunk_size
-        data = super().read(size)
-        if not data:
-            return data
-        self.bytes_read += len(data)
-        if self.max_bytes_per_sec > 0:
-            expected_elapsed = self.bytes_read / self.max_bytes_per_sec
-            actual_elapsed = time.time() - self.start_time
-            if expected_elapsed > actual_elapsed:
-                time.sleep(expected_elapsed - actual_elapsed)
-        # Throttle callbacks to avoid overwhelming (every 100ms or completion)
-        now = time.time()
-        if now - self.last_callback_time > 0.1 or self.bytes_read >= self.total_size:
-            self.callback(self.bytes_read, self.total_size)
-            self.last_callback_time = now
-        return data
-
-    def __enter__(self):
-        return self
-
-    def __exit__(self, *args):
-        self.close()
+        self.rate_limiter = rate_limiter
+
+    async def write(self, writer) -> None:
+        loop = asyncio.get_running_loop()
+        last_callback_time = 0.0
+        bytes_read = 0
+        with open(self._value, "rb", buffering=0) as f:
+            while True:
+                data = await loop.run_in_executor(None, f.read, self.chunk_size)
+                if not data:
+                    break
+                await writer.write(data)
+                bytes_read += len(data)
+                if self.rate_limiter:
+                    await self.rate_limiter.consume(len(data))
+                # Throttle callbacks to avoid overwhelming (every 100ms or completion)
+                now = time.monotonic()
+                if now - last_callback_time > 0.1 or bytes_read >= self._size:
+                    self.callback(bytes_read, self._size)
+                    last_callback_time = now
+
+    def decode(self, encoding: str = "utf-8", errors: str = "strict") -> str:
+        raise TypeError("Unable to decode a file upload payload")
 
 
 async def upload_to_espuino(
     ip: str,
-    file_path: Path,
+    file_path: Path | bytes,
     dest_path: str,
     title: str = "",
     max_retries: int = 3,
@@ -2041,15 +2275,19 @@ async def upload_to_espuino(
     total_tracks: int | None = None,
     max_kbps: int | None = None,
     is_aux: bool = False,
+    session: aiohttp.ClientSession | None = None,
+    rate_limiter: UploadRateLimiter | None = None,
 ) -> dict:
     """Upload a file to ESPuino SD card with progress tracking and retry logic.
 
     Args:
         ip: ESPuino IP address
-        file_path: Local path to the file to upload
+        file_path: Local path to the file to upload, or the content as bytes
         dest_path: Destination path on ESPuino SD card (e.g., "/teddycloud/abc123.mp3")
         title: Optional title for display in progress UI
         max_retries: Number of retry attempts on failure (default 3)
+        rate_limiter: Limiter to throttle with (default: the ESPuino's shared
+            limiter at max_kbps)
 
     Returns:
         dict with status and details
@@ -2057,9 +2295,11 @@ async def upload_to_espuino(
     import aiohttp
     from urllib.parse import quote
 
-    if not file_path.exists():
+    in_memory = isinstance(file_path, bytes)
+    if not in_memory and not file_path.exists():
         logger.error(f"File not found for upload: {file_path}")
         return {"success": False, "error": "File not found"}
+    source_name = Path(dest_path).name if in_memory else file_path.name
 
     if _should_cancel_upload(ip):
         logger.info(f"Upload cancelled before start for ESPuino {ip}: {dest_path}")
@@ -2076,7 +2316,7 @@ async def upload_to_espuino(
         )
         return {"success": False, "error": "Cancelled by user"}
 
-    file_size = file_path.stat().st_size
+    file_size = len(file_path) if in_memory else file_path.stat().st_size
     start_time = time.time()
     last_progress_time = time.time()
 
@@ -2089,7 +2329,7 @@ async def upload_to_espuino(
         total_bytes=file_size,
         started_at=start_time,
         title=title or Path(dest_path).name,
-        source_path=str(file_path),
+        source_path=None if in_memory else str(file_path),
         track_index=track_index,
         total_tracks=total_tracks,
         is_aux=is_aux,
@@ -2101,6 +2341,7 @@ async def upload_to_espuino(
         dest_dir = "/"
 
     url = f"http://{ip}/explorer?path={quote(dest_dir, safe='')}"
+    session = session or get_espuino_session()
 
     # Ensure destination directory exists (create parents if needed)
     async def ensure_dir(path: str) -> None:
@@ -2108,20 +2349,19 @@ async def upload_to_espuino(
             return
         parts = [p for p in path.split("/") if p]
         current = ""
-        async with aiohttp.ClientSession() as session:
-            for part in parts:
-                current += f"/{part}"
-                dir_url = f"http://{ip}/explorer?path={quote(current, safe='')}"
-                try:
-                    async with session.put(
-                        dir_url, timeout=aiohttp.ClientTimeout(total=5)
-                    ) as resp:
-                        if resp.status != 200:
-                            logger.debug(
-                                f"ESPuino {ip} mkdir {current} returned {resp.status}"
-                            )
-                except Exception as e:
-                    logger.debug(f"ESPuino {ip} mkdir {current} failed: {e}")
+        for part in parts:
+            current += f"/{part}"
+            dir_url = f"http://{ip}/explorer?path={quote(current, safe='')}"
+            try:
+                async with session.put(
+                    dir_url, timeout=aiohttp.ClientTimeout(total=5)
+                ) as resp:
+                    if resp.status != 200:
+                        logger.debug(
+                            f"ESPuino {ip} mkdir {current} returned {resp.status}"
+                        )
+            except Exception as e:
+                logger.debug(f"ESPuino {ip} mkdir {current} failed: {e}")
 
     await ensure_dir(dest_dir)
 
@@ -2146,7 +2386,7 @@ async def upload_to_espuino(
         if attempt > 0:
             delay = 5 * (2 ** (attempt - 1))  # 5s, 10s, 20s
             logger.info(
-                f"Retry {attempt + 1}/{max_retries} for {file_path.name} after {delay}s delay..."
+                f"Retry {attempt + 1}/{max_retries} for {source_name} after {delay}s delay..."
             )
             set_upload_status(
                 ip,
@@ -2179,7 +2419,7 @@ async def upload_to_espuino(
                         return
 
             logger.info(
-                f"Uploading to ESPuino {ip}: {file_path.name} ({file_size / 1024 / 1024:.1f}MB) -> {dest_path}"
+                f"Uploading to ESPuino {ip}: {source_name} ({file_size / 1024 / 1024:.1f}MB) -> {dest_path}"
             )
 
             # Update progress to show we're uploading
@@ -2196,104 +2436,113 @@ async def upload_to_espuino(
                 is_aux=is_aux,
             )
 
-            async with aiohttp.ClientSession() as session:
-                # Stream file content for upload with progress tracking (legacy style).
-                # ESPuino is sensitive to chunked transfer, so use FormData + ProgressFileReader.
-                def on_progress(bytes_read: int, total: int) -> None:
-                    nonlocal last_progress_time
-                    set_upload_status(
-                        ip,
-                        dest_path,
-                        "uploading",
-                        bytes_uploaded=bytes_read,
-                        total_bytes=total,
-                        title=title or Path(dest_path).name,
-                        track_index=track_index,
-                        total_tracks=total_tracks,
-                        is_aux=is_aux,
-                    )
-                    last_progress_time = time.time()
-                    if _should_cancel_upload(ip) and cancel_task:
-                        cancel_task.cancel()
+            # Stream file content for upload with progress tracking (legacy style).
+            # ESPuino is sensitive to chunked transfer, so use FormData + ThrottledFilePayload.
+            def on_progress(bytes_read: int, total: int) -> None:
+                nonlocal last_progress_time
+                set_upload_status(
+                    ip,
+                    dest_path,
+                    "uploading",
+                    bytes_uploaded=bytes_read,
+                    total_bytes=total,
+                    title=title or Path(dest_path).name,
+                    track_index=track_index,
+                    total_tracks=total_tracks,
+                    is_aux=is_aux,
+                )
+                last_progress_time = time.time()
+                if _should_cancel_upload(ip) and cancel_task:
+                    cancel_task.cancel()
 
+            if rate_limiter is None:
                 effective_kbps = (
                     ESPUINO_UPLOAD_MAX_KBPS if max_kbps is None else max_kbps
                 )
-                max_bytes_per_sec = effective_kbps * 1024 if effective_kbps > 0 else 0
+                rate_limiter = get_upload_rate_limiter(ip, effective_kbps * 1024)
 
-                content_type = (
-                    "application/json"
-                    if file_path.suffix.lower() == ".json"
-                    else "audio/mpeg"
+            content_type = (
+                "application/json"
+                if Path(dest_path).suffix.lower() == ".json"
+                else "audio/mpeg"
+            )
+            # In-memory payloads go in as bytes so the part keeps a known size
+            # (no chunked transfer); they are small enough to skip throttling.
+            if in_memory:
+                part = file_path
+            else:
+                part = ThrottledFilePayload(
+                    file_path,
+                    file_size,
+                    on_progress,
+                    rate_limiter=rate_limiter,
+                    filename=Path(dest_path).name,
+                    content_type=content_type,
                 )
-                with ProgressFileReader(
-                    file_path, on_progress, max_bytes_per_sec=max_bytes_per_sec
-                ) as reader:
-                    data = aiohttp.FormData()
-                    data.add_field(
-                        "file",
-                        reader,
-                        filename=Path(dest_path).name,
-                        content_type=content_type,
-                    )
+            data = aiohttp.FormData()
+            data.add_field(
+                "file",
+                part,
+                filename=Path(dest_path).name,
+                content_type=content_type,
+            )
 
-                    watchdog_task = asyncio.create_task(watchdog())
-                    # Set a generous timeout for large files (90 seconds per MB, min 180s)
-                    # ESPuino SD writes are slow (~300-500KB/s typical)
-                    timeout_seconds = max(180, int(file_size / 1024 / 1024 * 90))
+            watchdog_task = asyncio.create_task(watchdog())
+            # Set a generous timeout for large files (90 seconds per MB, min 180s)
+            # ESPuino SD writes are slow (~300-500KB/s typical)
+            timeout_seconds = max(180, int(file_size / 1024 / 1024 * 90))
 
-                    try:
-                        async with session.post(
-                            url,
-                            data=data,
-                            timeout=aiohttp.ClientTimeout(total=timeout_seconds),
-                        ) as resp:
-                            if resp.status == 200:
-                                elapsed = time.time() - start_time
-                                rate_mbps = (
-                                    (file_size / 1024 / 1024) / elapsed
-                                    if elapsed > 0
-                                    else 0
-                                )
-                                logger.info(
-                                    f"Upload complete to ESPuino {ip}: {dest_path} "
-                                    f"({file_size / 1024 / 1024:.1f}MB in {elapsed:.1f}s, {rate_mbps:.2f} MB/s)"
-                                )
-
-                                # Mark as complete (keep status for a few seconds for UI)
-                                set_upload_status(
-                                    ip,
-                                    dest_path,
-                                    "complete",
-                                    bytes_uploaded=file_size,
-                                    total_bytes=file_size,
-                                    started_at=start_time,
-                                    title=title or Path(dest_path).name,
-                                    track_index=track_index,
-                                    total_tracks=total_tracks,
-                                    is_aux=is_aux,
-                                )
-
-                                # Schedule cleanup after 5 seconds
-                                async def cleanup_status():
-                                    await asyncio.sleep(5)
-                                    clear_upload_status(ip, dest_path)
-
-                                asyncio.create_task(cleanup_status())
-
-                                return {
-                                    "success": True,
-                                    "path": dest_path,
-                                    "size": file_size,
-                                }
-                            else:
-                                text = await resp.text()
-                                last_error = f"HTTP {resp.status}: {text}"
-                                logger.warning(
-                                    f"ESPuino {ip} upload attempt {attempt + 1} failed: {last_error}"
-                                )
-                    finally:
-                        watchdog_task.cancel()
+            try:
+                async with session.post(
+                    url,
+                    data=data,
+                    timeout=aiohttp.ClientTimeout(total=timeout_seconds),
+                ) as resp:
+                    if resp.status == 200:
+                        elapsed = time.time() - start_time
+                        rate_mbps = (
+                            (file_size / 1024 / 1024) / elapsed if elapsed > 0 else 0
+                        )
+                        logger.info(
+                            f"Upload complete to ESPuino {ip}: {dest_path} "
+                            f"({file_size / 1024 / 1024:.1f}MB in {elapsed:.1f}s, {rate_mbps:.2f} MB/s)"
+                        )
+
+                        # Mark as complete (keep status for a few seconds for UI)
+                        set_upload_status(
+                            ip,
+                            dest_path,
+                            "complete",
+                            bytes_uploaded=file_size,
+                            total_bytes=file_size,
+                            started_at=start_time,
+                            title=title or Path(dest_path).name,
+                            track_index=track_index,
+                            total_tracks=total_tracks,
+                            is_aux=is_aux,
+                        )
+
+                        # Schedule cleanup after 5 seconds
+                        async def cleanup_status():
+                            await asyncio.sleep(5)
+                            clear_upload_status(ip, dest_path)
+
+                        asyncio.create_task(cleanup_status())
+                        _note_espuino_file(ip, dest_path, file_size)
+
+                        return {
+                            "success": True,
+                            "path": dest_path,
+                            "size": file_size,
+                        }
+                    else:
+                        text = await resp.text()
+                        last_error = f"HTTP {resp.status}: {text}"
+                        logger.warning(
+                            f"ESPuino {ip} upload attempt {attempt + 1} failed: {last_error}"
+                        )
+            finally:
+                watchdog_task.cancel()
 
         except asyncio.TimeoutError:
             last_error = "Timeout"
@@ -2338,7 +2587,9 @@ async def upload_to_espuino(
     return {"success": False, "error": last_error}
 
 
-async def check_espuino_file_exists(ip: str, file_path: str) -> bool:
+async def check_espuino_file_exists(
+    ip: str, file_path: str, session: aiohttp.ClientSession | None = None
+) -> bool:
     """Check if a file exists on ESPuino SD card.
 
     Args:
@@ -2351,46 +2602,55 @@ async def check_espuino_file_exists(ip: str, file_path: str) -> bool:
     import aiohttp
     from urllib.parse import quote
 
-    try:
-        # ESPuino /explorer endpoint returns directory listing
-        # We check if the parent directory contains the file
-        parent_dir = str(Path(file_path).parent)
-        if parent_dir == ".":
-            parent_dir = "/"
+    # ESPuino /explorer endpoint returns directory listing
+    # We check if the parent directory contains the file
+    parent_dir = _espuino_parent_dir(file_path)
+    listing = _cached_espuino_listing(ip, parent_dir)
+    if listing is not None:
+        return Path(file_path).name in listing
 
+    try:
         url = f"http://{ip}/explorer?path={quote(parent_dir, safe='')}"
 
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, timeout=aiohttp.ClientTimeout(total=5)) as resp:
-                if resp.status == 200:
-                    files = await resp.json()
-                    target_name = Path(file_path).name
-                    return any(f.get("name") == target_name for f in files)
-                return False
+        session = session or get_espuino_session()
+        async with session.get(url, timeout=aiohttp.ClientTimeout(total=5)) as resp:
+            if resp.status == 200:
+                files = await resp.json()
+                _remember_espuino_listing(ip, parent_dir, files)
+                target_name = Path(file_path).name
+                return any(f.get("name") == target_name for f in files)
+            return False
     except Exception as e:
         logger.debug(f"Failed to check file on ESPuino {ip}: {e}")
         return False
 
 
-async def delete_espuino_file(ip: str, file_path: str) -> bool:
+async def delete_espuino_file(
+    ip: str, file_path: str, session: aiohttp.ClientSession | None = None
+) -> bool:
     """Delete a file on ESPuino SD card."""
     import aiohttp
     from urllib.parse import quote
 
     try:
         url = f"http://{ip}/explorer?path={quote(file_path, safe='')}"
-        async with aiohttp.ClientSession() as session:
-            async with session.delete(
-                url, timeout=aiohttp.ClientTimeout(total=10)
-            ) as resp:
-                return resp.status == 200
+        session = session or get_espuino_session()
+        async with session.delete(url, timeout=aiohttp.ClientTimeout(total=10)) as resp:
+            if resp.status == 200:
+                _note_espuino_file(ip, file_path, None)
+                return True
+            return False
     except Exception as e:
         logger.debug(f"Failed to delete file on ESPuino {ip}: {e}")
         return False
 
 
 async def set_espuino_rfid_mapping(
-    ip: str, tag_id: str, folder_path: str, play_mode: int = 5
+    ip: str,
+    tag_id: str,
+    folder_path: str,
+    play_mode: int = 5,
+    session: aiohttp.ClientSession | None = None,
 ) -> bool:
     """Create/update an ESPuino RFID mapping (e.g., play all tracks in folder sorted)."""
     import aiohttp
@@ -2406,17 +2666,41 @@ async def set_espuino_rfid_mapping(
     }
     try:
         url = f"http://{ip}/rfid"
-        async with aiohttp.ClientSession() as session:
-            async with session.post(
-                url, json=payload, timeout=aiohttp.ClientTimeout(total=10)
-            ) as resp:
-                return resp.status == 200
+        session = session or get_espuino_session()
+        async with session.post(
+            url, json=payload, timeout=aiohttp.ClientTimeout(total=10)
+        ) as resp:
+            return resp.status == 200
     except Exception as e:
         logger.debug(f"Failed to set RFID mapping on ESPuino {ip}: {e}")
         return False
 
 
-async def get_espuino_file_size(ip: str, file_path: str) -> int | None:
+async def read_espuino_text_file(
+    ip: str, file_path: str, session: aiohttp.ClientSession | None = None
+) -> str | None:
+    """Download a small text file from ESPuino SD card.
+
+    Returns the file content, or None if it doesn't exist or on error.
+    """
+    import aiohttp
+    from urllib.parse import quote
+
+    try:
+        url = f"http://{ip}/explorerdownload?path={quote(file_path, safe='')}"
+        session = session or get_espuino_session()
+        async with session.get(url, timeout=aiohttp.ClientTimeout(total=5)) as resp:
+            if resp.status == 200:
+                return await resp.text()
+            return None
+    except Exception as e:
+        logger.debug(f"Failed to read file on ESPuino {ip}: {e}")
+        return None
+
+
+async def get_espuino_file_size(
+    ip: str, file_path: str, session: aiohttp.ClientSession | None = None
+) -> int | None:
     """Get the size of a file on ESPuino SD card.
 
     Returns file size in bytes, or None if file doesn't exist or error.
@@ -2424,33 +2708,42 @@ async def get_espuino_file_size(ip: str, file_path: str) -> int | None:
     import aiohttp
     from urllib.parse import quote
 
-    try:
-        parent_dir = str(Path(file_path).parent)
-        if parent_dir == ".":
-            parent_dir = "/"
+    parent_dir = _espuino_parent_dir(file_path)
+    listing = _cached_espuino_listing(ip, parent_dir)
+    if listing is not None:
+        return listing.get(Path(file_path).name)
 
+    try:
         url = f"http://{ip}/explorer?path={quote(parent_dir, safe='')}"
 
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, timeout=aiohttp.ClientTimeout(total=5)) as resp:
-                if resp.status == 200:
-                    files = await resp.json()
-                    target_name = Path(file_path).name
-                    for f in files:
-                        if f.get("name") == target_name:
-                            return f.get("size", 0)
-                return None
+        session = session or get_espuino_session()
+        async with session.get(url, timeout=aiohttp.ClientTimeout(total=5)) as resp:
+            if resp.status == 200:
+                files = await resp.json()
+                _remember_espuino_listing(ip, parent_dir, files)
+                target_name = Path(file_path).name
+                for f in files:
+                    if f.get("name") == target_name:
+                        return f.get("size", 0)
+            return None
     except Exception as e:
         logger.debug(f"Failed to get file size on ESPuino {ip}: {e}")
         return None
 
 
 async def verify_espuino_upload(
-    ip: str, folder_path: str, uid_map_path: str | None = None
+    ip: str,
+    folder_path: str,
+    uid_map_path: str | None = None,
+    session: aiohttp.ClientSession | None = None,
+    expected: dict | None = None,
 ) -> dict:
     """
     Verify upload completeness by checking metadata.json and file sizes.
 
+    Pass `expected` (a metadata dict with "tracks") to check against a local
+    manifest instead of downloading metadata.json / the uid_map.
+
     Returns:
         {
             "complete": bool,
@@ -2507,97 +2800,112 @@ async def verify_espuino_upload(
                         return None
         return None
 
+    async def fetch_text(target: str, total: float) -> tuple[int, str]:
+        async with session.get(
+            target, timeout=aiohttp.ClientTimeout(total=total)
+        ) as resp:
+            if resp.status != 200:
+                return resp.status, ""
+            return resp.status, await resp.text()
+
     try:
-        # First, check if metadata.json exists and read it
         metadata_path = f"{folder_path}/metadata.json"
         url = f"http://{ip}/explorer?path={quote(folder_path, safe='')}"
+        metadata_url = (
+            f"http://{ip}/explorerdownload?path={quote(metadata_path, safe='')}"
+        )
 
-        async with aiohttp.ClientSession() as session:
-            # Get directory listing
-            async with session.get(url, timeout=aiohttp.ClientTimeout(total=5)) as resp:
-                if resp.status != 200:
-                    logger.debug(f"Folder not found on ESPuino: {folder_path}")
-                    return result
-                # ESPuino sometimes returns garbage after JSON - try to extract valid JSON
-                try:
-                    raw_text = await resp.text()
-                    # Find the end of the JSON array
-                    bracket_count = 0
-                    json_end = 0
-                    for i, char in enumerate(raw_text):
-                        if char == "[":
-                            bracket_count += 1
-                        elif char == "]":
-                            bracket_count -= 1
-                            if bracket_count == 0:
-                                json_end = i + 1
-                                break
-                    if json_end > 0:
-                        files = json_lib.loads(raw_text[:json_end])
-                    else:
-                        files = json_lib.loads(raw_text)
-                except (json_lib.JSONDecodeError, ValueError) as e:
-                    logger.warning(f"Failed to parse ESPuino explorer response: {e}")
+        session = session or get_espuino_session()
+        # Fetch the directory listing and both manifests in one round trip;
+        # the listing still decides which manifest is used.
+        probes = [fetch_text(url, 5)]
+        if expected is None:
+            probes.append(fetch_text(metadata_url, 10))
+        if expected is None and uid_map_path:
+            uid_url = (
+                f"http://{ip}/explorerdownload?path={quote(uid_map_path, safe='')}"
+            )
+            probes.append(fetch_text(uid_url, 10))
+        responses = await asyncio.gather(*probes, return_exceptions=True)
+
+        listing = responses[0]
+        if isinstance(listing, BaseException):
+            raise listing
+        status, raw_text = listing
+        if status != 200:
+            logger.debug(f"Folder not found on ESPuino: {folder_path}")
+            return result
+        # ESPuino sometimes returns garbage after JSON - try to extract valid JSON
+        try:
+            # Find the end of the JSON array
+            bracket_count = 0
+            json_end = 0
+            for i, char in enumerate(raw_text):
+                if char == "[":
+                    bracket_count += 1
+                elif char == "]":
+                    bracket_count -= 1
+                    if bracket_count == 0:
+                        json_end = i + 1
+                        break
+            if json_end > 0:
+                files = json_lib.loads(raw_text[:json_end])
+            else:
+                files = json_lib.loads(raw_text)
+        except (json_lib.JSONDecodeError, ValueError) as e:
+            logger.warning(f"Failed to parse ESPuino explorer response: {e}")
+            return result
+
+        # Build file index by name
+        file_index = {f.get("name"): f for f in files}
+        _remember_espuino_listing(ip, folder_path, files)
+
+        # Check for metadata.json
+        if expected is not None:
+            result["metadata"] = expected
+        elif "metadata.json" in file_index:
+            if isinstance(responses[1], BaseException):
+                raise responses[1]
+            status, raw = responses[1]
+            if status == 200:
+                parsed = extract_json_blob(raw)
+                if isinstance(parsed, dict):
+                    result["metadata"] = parsed
+                else:
+                    logger.warning("Failed to parse metadata.json payload")
                     return result
-
-            # Build file index by name
-            file_index = {f.get("name"): f for f in files}
-
-            # Check for metadata.json
-            if "metadata.json" in file_index:
-                # Download and parse metadata.json
-                metadata_url = (
-                    f"http://{ip}/explorerdownload?path={quote(metadata_path, safe='')}"
-                )
-                async with session.get(
-                    metadata_url, timeout=aiohttp.ClientTimeout(total=10)
-                ) as resp:
-                    if resp.status == 200:
-                        raw = await resp.text()
-                        parsed = extract_json_blob(raw)
-                        if isinstance(parsed, dict):
-                            result["metadata"] = parsed
-                        else:
-                            logger.warning("Failed to parse metadata.json payload")
-                            return result
-                    else:
-                        logger.warning(
-                            f"Failed to read metadata.json: HTTP {resp.status}"
-                        )
-                        return result
-            elif uid_map_path:
-                uid_url = (
-                    f"http://{ip}/explorerdownload?path={quote(uid_map_path, safe='')}"
-                )
-                async with session.get(
-                    uid_url, timeout=aiohttp.ClientTimeout(total=10)
-                ) as resp:
-                    if resp.status == 200:
-                        raw = await resp.text()
-                        parsed = extract_json_blob(raw)
-                        if isinstance(parsed, dict):
-                            files = parsed.get("files", [])
-                            result["metadata"] = {
-                                "tracks": [
-                                    {
-                                        "index": f.get("index", i),
-                                        "file": f.get("name", ""),
-                                        "size": f.get("size", 0),
-                                    }
-                                    for i, f in enumerate(files)
-                                ]
+            else:
+                logger.warning(f"Failed to read metadata.json: HTTP {status}")
+                return result
+        elif uid_map_path:
+            if isinstance(responses[2], BaseException):
+                raise responses[2]
+            status, raw = responses[2]
+            if status == 200:
+                parsed = extract_json_blob(raw)
+                if isinstance(parsed, dict):
+                    files = parsed.get("files", [])
+                    result["metadata"] = {
+                        "tracks": [
+                            {
+                                "index": f.get("index", i),
+                                "file": f.get("name", ""),
+                                "size": f.get("size", 0),
                             }
-                            result["metadata"]["uid"] = parsed.get("uid")
-                            result["folder"] = parsed.get("folder")
-                        else:
-                            logger.warning("Failed to parse UID map payload")
-                            return result
-                    else:
-                        logger.warning(f"Failed to read UID map: HTTP {resp.status}")
-                        return result
+                            for i, f in enumerate(files)
+                        ]
+                    }
+                    result["metadata"]["uid"] = parsed.get("uid")
+                    result["folder"] = parsed.get("folder")
+                else:
+                    logger.warning("Failed to parse UID map payload")
+                    return result
             else:
-                logger.debug(f"No metadata.json found in {folder_path}")
+                logger.warning(f"Failed to read UID map: HTTP {status}")
                 return result
+        else:
+            logger.debug(f"No metadata.json found in {folder_path}")
+            return result
 
         metadata = result["metadata"]
         tracks = metadata.get("tracks", [])
@@ -12,6 +12,7 @@ import time
 from pathlib import Path
 from typing import AsyncGenerator
 from dataclasses import dataclass, asdict
+from functools import lru_cache
 
 logger = logging.getLogger(__name__)
 
@@ -19,6 +20,15 @@ logger = logging.getLogger(__name__)
 # Key: tonie_key (hash of source URL), Value: dict with status info
 _encoding_status: dict[str, dict] = {}
 
+# Statuses after which an encode is finished (successfully or not)
+FINAL_ENCODING_STATUSES = ("cached", "ready", "error")
+
+# Device types that can have tracks queued while later ones still encode
+PROGRESSIVE_TYPES = frozenset({"sonos", "chromecast"})
+
+# cache_key -> Event set when encoding reaches a final status (see wait_for_encoding)
+_encoding_done_events: dict[str, asyncio.Event] = {}
+
 # Locks to prevent concurrent encoding of the same Tonie
 _encoding_locks: dict[str, asyncio.Lock] = {}
 
@@ -200,6 +210,7 @@ def has_embedded_cover(mp3_path: Path) -> bool:
         return False
 
 
+@lru_cache(maxsize=1024)
 def get_tonie_cache_key(source_url: str) -> str:
     """Generate a cache key from source URL for folder naming."""
     return hashlib.sha256(source_url.encode()).hexdigest()[:16]
@@ -210,6 +221,7 @@ def get_tonie_cache_dir(source_url: str) -> Path:
     return CACHE_DIR / get_tonie_cache_key(source_url)
 
 
+@lru_cache(maxsize=8192)
 def get_track_cache_path(source_url: str, track_index: int) -> Path:
     """Get the MP3 cache file path for a specific track."""
     return get_tonie_cache_dir(source_url) / f"{track_index + 1:02d}.mp3"
@@ -220,6 +232,36 @@ def get_metadata_path(source_url: str) -> Path:
     return get_tonie_cache_dir(source_url) / "metadata.json"
 
 
+def write_metadata(metadata_path: Path, metadata: TonieMetadata) -> None:
+    """Write metadata.json (blocking; call via asyncio.to_thread)."""
+    with open(metadata_path, "w") as f:
+        json.dump(metadata.to_dict(), f, indent=2)
+
+
+# Cache keys whose metadata.json is known to exist (all tracks encoded)
+_encoded_cache_keys: set[str] = set()
+
+
+def is_fully_encoded(source_url: str) -> bool:
+    """Check whether all tracks for a Tonie are cached (metadata.json exists).
+
+    Positive results are remembered so repeat playbacks skip the stat();
+    cache eviction and clearing forget them again.
+    """
+    cache_key = get_tonie_cache_key(source_url)
+    if cache_key in _encoded_cache_keys:
+        return True
+    if (CACHE_DIR / cache_key / "metadata.json").exists():
+        _encoded_cache_keys.add(cache_key)
+        return True
+    return False
+
+
+def forget_fully_encoded(source_url: str) -> None:
+    """Drop the remembered cached state after a Tonie's cache is deleted."""
+    _encoded_cache_keys.discard(get_tonie_cache_key(source_url))
+
+
 # Legacy single-file support
 def get_cache_key(source_url: str) -> str:
     """Generate a cache key from source URL (legacy single-file)."""
@@ -359,6 +401,28 @@ def set_encoding_status(source_url: str, status: str, **kwargs) -> None:
     logger.debug(
         f"Encoding status [{cache_key[:8]}]: {status} - {kwargs.get('current_track', '?')}/{kwargs.get('total_tracks', '?')}"
     )
+    if status in FINAL_ENCODING_STATUSES:
+        event = _encoding_done_events.pop(cache_key, None)
+        if event:
+            event.set()
+
+
+async def wait_for_encoding(source_url: str, timeout: float = 600) -> dict:
+    """Wait until encoding for source_url reaches a final status.
+
+    Woken by set_encoding_status() instead of polling. Returns the encoding
+    status afterwards; on timeout the (non-final) current status is returned.
+    """
+    status = get_encoding_status(source_url)
+    if status.get("status") in FINAL_ENCODING_STATUSES:
+        return status
+    cache_key = get_tonie_cache_key(source_url)
+    event = _encoding_done_events.setdefault(cache_key, asyncio.Event())
+    try:
+        await asyncio.wait_for(event.wait(), timeout=timeout)
+    except asyncio.TimeoutError:
+        pass
+    return get_encoding_status(source_url)
 
 
 def clear_encoding_status(source_url: str) -> None:
@@ -399,6 +463,7 @@ def cleanup_cache(target_bytes: int) -> int:
         item, _, item_size, is_folder = items.pop(0)
         if is_folder:
             shutil.rmtree(item)
+            _encoded_cache_keys.discard(item.name)
             logger.info(f"Cache evict folder: {item.name} ({item_size // 1024} KB)")
         else:
             item.unlink()
@@ -433,6 +498,7 @@ def clear_cache() -> int:
     folders = [d for d in CACHE_DIR.iterdir() if d.is_dir()]
     for folder in folders:
         shutil.rmtree(folder)
+    _encoded_cache_keys.clear()
 
     # Also clean legacy single files
     for f in CACHE_DIR.glob("*.mp3"):
@@ -771,8 +837,7 @@ async def encode_tonie_tracks(
             tracks=track_infos,
         )
 
-        with open(metadata_path, "w") as f:
-            json.dump(metadata.to_dict(), f, indent=2)
+        await asyncio.to_thread(write_metadata, metadata_path, metadata)
 
         # Calculate total size
         total_size = sum((cache_dir / t.filename).stat().st_size for t in track_infos)
@@ -958,6 +1023,43 @@ async def encode_first_track(
         return first_track_path
 
 
+async def _notify_track_complete(
+    on_track_complete: callable, track_index: int, track_path: Path
+) -> None:
+    """Invoke an on_track_complete callback, logging (not raising) its errors."""
+    if not on_track_complete:
+        return
+    try:
+        await on_track_complete(track_index, track_path)
+    except Exception as e:
+        logger.warning(f"on_track_complete callback error: {e}")
+
+
+async def _queue_ready_tracks(
+    playback_device: dict,
+    ready: asyncio.Queue,
+    server_base_url: str,
+    cache_key: str,
+    album: str,
+) -> None:
+    """Append each track index from `ready` (None ends) to the device's queue.
+
+    Runs beside the encoder, so device round-trips overlap the next ffmpeg run.
+    """
+    from . import devices as device_service
+
+    while (i := await ready.get()) is not None:
+        track_url = f"{server_base_url}/tracks/{cache_key}/{i + 1:02d}.mp3"
+        try:
+            queued = await device_service.queue_track_on_device(
+                playback_device, track_url, f"{album} - Track {i + 1}"
+            )
+            if queued:
+                logger.info(f"Queued track {i + 1} on {playback_device.get('type')}")
+        except Exception as e:
+            logger.warning(f"Failed to queue track {i + 1}: {e}")
+
+
 async def continue_encoding_remaining_tracks(
     source_url: str,
     tracks: list[dict],
@@ -968,6 +1070,7 @@ async def continue_encoding_remaining_tracks(
     cover_url: str = "",
     playback_device: dict = None,
     server_base_url: str = None,
+    on_track_complete: callable = None,
 ) -> TonieMetadata | None:
     """
     Continue encoding tracks 2+ in background after first track is done.
@@ -977,11 +1080,15 @@ async def continue_encoding_remaining_tracks(
 
     If playback_device is provided (Sonos/Chromecast), tracks are queued
     progressively as they're encoded - no need to wait for all tracks.
+
+    on_track_complete(track_index, track_path) is called for every track that
+    is ready in the cache, including the already encoded first track.
     """
     if len(tracks) <= 1:
         # Only one track, create metadata and return
         cache_dir = get_tonie_cache_dir(source_url)
         metadata_path = get_metadata_path(source_url)
+        await _notify_track_complete(on_track_complete, 0, cache_dir / "01.mp3")
 
         first_track = tracks[0]
         track_info = TrackInfo(
@@ -1009,8 +1116,7 @@ async def continue_encoding_remaining_tracks(
             tracks=[track_info],
         )
 
-        with open(metadata_path, "w") as f:
-            json.dump(metadata.to_dict(), f, indent=2)
+        await asyncio.to_thread(write_metadata, metadata_path, metadata)
 
         set_encoding_status(
             source_url, "ready", progress=100, total_tracks=1, tracks_completed=1
@@ -1051,109 +1157,114 @@ async def continue_encoding_remaining_tracks(
                 filename="01.mp3",
             )
         )
-
-        # Encode remaining tracks (index 1+)
-        for i in range(1, len(tracks)):
-            track = tracks[i]
-            track_name = track.get("name", f"Track {i + 1}")
-            start_seconds = track.get("start", 0)
-            duration_seconds = track.get("duration", 0)
-
-            if duration_seconds <= 0:
-                logger.warning(f"Skipping track {i + 1} with zero duration")
-                continue
-
-            filename = f"{i + 1:02d}.mp3"
-            output_path = cache_dir / filename
-
-            # Check if already cached (re-encode if cover missing)
-            if output_path.exists() and output_path.stat().st_size > 0:
-                if cover_path and not has_embedded_cover(output_path):
-                    logger.info(
-                        f"Track {i + 1} cached without cover, re-encoding: {output_path}"
-                    )
-                else:
-                    logger.info(f"Track {i + 1} already cached: {output_path}")
-                    track_infos.append(
-                        TrackInfo(
-                            index=i,
-                            name=track_name,
-                            start_seconds=start_seconds,
-                            duration_seconds=duration_seconds,
-                            filename=filename,
-                        )
-                    )
-                    continue
-
-            # Update progress
-            progress = int(((i) / len(tracks)) * 100)
-            set_encoding_status(
-                source_url,
-                "encoding",
-                progress=progress,
-                current_track=i + 1,
-                total_tracks=len(tracks),
-                tracks_completed=i,
-                started_at=start_time,
+        await _notify_track_complete(on_track_complete, 0, cache_dir / "01.mp3")
+
+        # Progressive playback: a separate task queues each ready track on
+        # the device while the next one encodes
+        ready = pusher = None
+        if (
+            playback_device
+            and server_base_url
+            and playback_device.get("type") in PROGRESSIVE_TYPES
+        ):
+            ready = asyncio.Queue()
+            pusher = asyncio.create_task(
+                _queue_ready_tracks(
+                    playback_device, ready, server_base_url, cache_key, album
+                )
             )
 
-            if espuino_ip:
-                await notify_espuino_progress(espuino_ip, progress)
+        try:
+            # Encode remaining tracks (index 1+)
+            for i in range(1, len(tracks)):
+                track = tracks[i]
+                track_name = track.get("name", f"Track {i + 1}")
+                start_seconds = track.get("start", 0)
+                duration_seconds = track.get("duration", 0)
+
+                if duration_seconds <= 0:
+                    logger.warning(f"Skipping track {i + 1} with zero duration")
+                    continue
 
-            logger.info(f"Encoding track {i + 1}/{len(tracks)}: {track_name}")
+                filename = f"{i + 1:02d}.mp3"
+                output_path = cache_dir / filename
 
-            success = await encode_track_to_mp3(
-                source_url=source_url,
-                output_path=output_path,
-                start_seconds=start_seconds,
-                duration_seconds=duration_seconds,
-                track_index=i,
-                track_name=track_name,
-                album=album,
-                artist=artist,
-                total_tracks=len(tracks),
-                year=year,
-                cover_path=cover_path,
-            )
+                # Check if already cached (re-encode if cover missing)
+                if output_path.exists() and output_path.stat().st_size > 0:
+                    if cover_path and not has_embedded_cover(output_path):
+                        logger.info(
+                            f"Track {i + 1} cached without cover, re-encoding: {output_path}"
+                        )
+                    else:
+                        logger.info(f"Track {i + 1} already cached: {output_path}")
+                        track_infos.append(
+                            TrackInfo(
+                                index=i,
+                                name=track_name,
+                                start_seconds=start_seconds,
+                                duration_seconds=duration_seconds,
+                                filename=filename,
+                            )
+                        )
+                        await _notify_track_complete(on_track_complete, i, output_path)
+                        if ready is not None:
+                            ready.put_nowait(i)
+                        continue
 
-            if not success:
-                logger.error(f"Failed to encode track {i + 1}")
+                # Update progress
+                progress = int(((i) / len(tracks)) * 100)
                 set_encoding_status(
-                    source_url, "error", error=f"Failed to encode track {i + 1}"
+                    source_url,
+                    "encoding",
+                    progress=progress,
+                    current_track=i + 1,
+                    total_tracks=len(tracks),
+                    tracks_completed=i,
+                    started_at=start_time,
                 )
-                return None
 
-            track_infos.append(
-                TrackInfo(
-                    index=i,
-                    name=track_name,
+                if espuino_ip:
+                    await notify_espuino_progress(espuino_ip, progress)
+
+                logger.info(f"Encoding track {i + 1}/{len(tracks)}: {track_name}")
+
+                success = await encode_track_to_mp3(
+                    source_url=source_url,
+                    output_path=output_path,
                     start_seconds=start_seconds,
                     duration_seconds=duration_seconds,
-                    filename=filename,
+                    track_index=i,
+                    track_name=track_name,
+                    album=album,
+                    artist=artist,
+                    total_tracks=len(tracks),
+                    year=year,
+                    cover_path=cover_path,
                 )
-            )
-
-            # Queue track on device if progressive playback is enabled
-            if (
-                playback_device
-                and server_base_url
-                and playback_device.get("type") in ["sonos", "chromecast"]
-            ):
-                try:
-                    from . import devices as device_service
 
-                    cache_key = get_tonie_cache_key(source_url)
-                    track_url = f"{server_base_url}/tracks/{cache_key}/{i + 1:02d}.mp3"
-                    track_title = f"{album} - Track {i + 1}"
-                    queued = await device_service.queue_track_on_device(
-                        playback_device, track_url, track_title
+                if not success:
+                    logger.error(f"Failed to encode track {i + 1}")
+                    set_encoding_status(
+                        source_url, "error", error=f"Failed to encode track {i + 1}"
                     )
-                    if queued:
-                        logger.info(
-                            f"Queued track {i + 1} on {playback_device.get('type')}"
-                        )
-                except Exception as e:
-                    logger.warning(f"Failed to queue track {i + 1}: {e}")
+                    return None
+
+                track_infos.append(
+                    TrackInfo(
+                        index=i,
+                        name=track_name,
+                        start_seconds=start_seconds,
+                        duration_seconds=duration_seconds,
+                        filename=filename,
+                    )
+                )
+                await _notify_track_complete(on_track_complete, i, output_path)
+                if ready is not None:
+                    ready.put_nowait(i)
+        finally:
+            if pusher:
+                ready.put_nowait(None)
+                await pusher
 
         # Create metadata file
         metadata = TonieMetadata(
@@ -1166,8 +1277,7 @@ async def continue_encoding_remaining_tracks(
             tracks=track_infos,
         )
 
-        with open(metadata_path, "w") as f:
-            json.dump(metadata.to_dict(), f, indent=2)
+        await asyncio.to_thread(write_metadata, metadata_path, metadata)
 
         # Calculate total size
         total_size = sum(